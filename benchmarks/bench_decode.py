@@ -0,0 +1,59 @@
+"""Cost of decoding one status payload.
+
+Compares the stdlib json module with orjson (when installed), with and
+without keeping only the RESULT fields used by the model, followed by the
+device snapshot decoding done by set_data.
+
+Run from the repository root:
+    python -m benchmarks.bench_decode [--number 20000]
+"""
+
+import argparse
+import json
+import timeit
+
+from benchmarks.payloads import AIRLEAF_PAYLOAD, TWOPOINTZERO_PAYLOAD
+from innova_controls.airleaf import AirLeaf
+from innova_controls.decoding import StatusDecoder, orjson
+from innova_controls.twopointzero import TwoPointZero
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    loaders = {"json": json.loads}
+    if orjson is not None:
+        loaders["orjson"] = orjson.loads
+    else:
+        print("orjson is not installed, only the json module is measured")
+
+    print(f"{'Model':<10}{'Decoder':<20}{'Decode':>12}{'+ set_data':>14}")
+    for name, device_class, payload in (
+        ("2.0", TwoPointZero, TWOPOINTZERO_PAYLOAD),
+        ("AirLeaf", AirLeaf, AIRLEAF_PAYLOAD),
+    ):
+        device = device_class(None)
+        for loader_name, loads in loaders.items():
+            for selective in (False, True):
+                fields = device_class.STATUS_FIELDS if selective else None
+                decoder = StatusDecoder(fields, loads)
+                label = f"{loader_name}{' selective' if selective else ''}"
+
+                decode = timeit.timeit(
+                    lambda: decoder.decode(payload), number=args.number
+                )
+                full = timeit.timeit(
+                    lambda: device.set_data(decoder.decode(payload)),
+                    number=args.number,
+                )
+                print(
+                    f"{name:<10}{label:<20}"
+                    f"{decode / args.number * 1e6:>9.2f} us"
+                    f"{full / args.number * 1e6:>11.2f} us"
+                )
+
+
+if __name__ == "__main__":
+    main()
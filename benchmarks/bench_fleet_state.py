@@ -0,0 +1,105 @@
+"""Dashboard queries over a fleet, with and without FleetState.
+
+Refreshes a fleet against the in-process stub server, then times the
+same dashboard (average ambient per floor, units more than 3 degrees away
+from their setpoint, units per mode) computed by reading the properties of
+every Innova, and with the vectorized queries of a FleetState. Requires
+numpy.
+
+Run from the repository root:
+    python -m benchmarks.bench_fleet_state [--units 10000] [--floors 20]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter, defaultdict
+
+from aiohttp import ClientSession, TCPConnector
+
+from benchmarks.payloads import TWOPOINTZERO_STATUS
+from benchmarks.stub_server import StubServer
+from innova_controls.fleet import InnovaFleet
+from innova_controls.fleet_analytics import MODE_KINDS, FleetState, mode_kind
+
+
+def property_dashboard(fleet: InnovaFleet, floors: dict[str, int]) -> tuple:
+    totals = defaultdict(float)
+    counts = defaultdict(int)
+    far = []
+    modes = Counter()
+    for key, innova in fleet.units.items():
+        totals[floors[key]] += innova.ambient_temp
+        counts[floors[key]] += 1
+        if innova.power:
+            if abs(innova.ambient_temp - innova.target_temperature) > 3:
+                far.append(key)
+            kind = mode_kind(innova.mode)
+            if kind >= 0:
+                modes[MODE_KINDS[kind]] += 1
+    means = {floor: totals[floor] / counts[floor] for floor in totals}
+    return means, far, modes
+
+
+def columnar_dashboard(state: FleetState) -> tuple:
+    return (
+        state.group_means("ambient_temp"),
+        state.far_from_setpoint(3),
+        state.mode_counts(),
+    )
+
+
+def median_time(operation, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+async def run(units: int, floors: int, runs: int) -> None:
+    # Powered on units, so every query has to look at all of them
+    status = dict(TWOPOINTZERO_STATUS, RESULT=dict(TWOPOINTZERO_STATUS["RESULT"], ps=1))
+    async with StubServer(json.dumps(status).encode()) as server:
+        connector = TCPConnector(limit=100)
+        async with ClientSession(connector=connector) as session:
+            fleet = InnovaFleet(session, concurrency=100)
+            for unit in range(units):
+                fleet.add_unit(server.host(unit))
+            await fleet.async_update()
+            floor_of = {key: index % floors for index, key in enumerate(fleet.units)}
+
+            start = time.perf_counter()
+            state = FleetState(fleet)
+            state.set_groups(floor_of)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await fleet.async_update()
+            refresh = time.perf_counter() - start
+
+    loop_time = median_time(lambda: property_dashboard(fleet, floor_of), runs)
+    columnar_time = median_time(lambda: columnar_dashboard(state), runs)
+    print(f"{units} units, FleetState built in {build * 1000:.1f}ms")
+    print(f"Fleet refresh with FleetState attached: {refresh * 1000:.0f}ms")
+    print(f"{'Property loop':<16}{loop_time * 1000:>10.2f}ms")
+    print(
+        f"{'FleetState':<16}{columnar_time * 1000:>10.2f}ms"
+        f"{loop_time / columnar_time:>8.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=10000)
+    parser.add_argument("--floors", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.units, args.floors, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Import time of the innova_controls modules, checked against a budget.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+best of a few runs. The lightweight modules must not import networking
+(aiohttp), and importing innova must not load any device model. Exits with
+status 1 when a budget is exceeded or a forbidden module is imported, so it
+can run in CI.
+
+Run from the repository root:
+    python -m benchmarks.bench_import [--runs 5] [--scale 1.0]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Module: (budget in milliseconds, modules it must not import)
+BUDGETS = {
+    "innova_controls.fan_speed": (15, ("aiohttp",)),
+    "innova_controls.mode": (15, ("aiohttp",)),
+    "innova_controls.constants": (15, ("aiohttp",)),
+    "innova_controls.snapshot": (15, ("aiohttp",)),
+    "innova_controls.innova_factory": (20, ("aiohttp", "innova_controls.airleaf")),
+    "innova_controls.innova": (
+        150,
+        ("aiohttp", "innova_controls.twopointzero", "innova_controls.airleaf"),
+    ),
+    "innova_controls.fleet": (150, ("aiohttp",)),
+    "innova_controls.network_functions": (400, ()),
+}
+
+
+def import_profile(module: str) -> dict[str, float]:
+    """Cumulative import time of every module loaded by importing module, in
+    milliseconds"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        profile[name.strip()] = int(cumulative) / 1000
+    return profile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply budgets, for slow hosts"
+    )
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'Module':<36}{'Time':>10}{'Budget':>10}  Result")
+    for module, (budget, forbidden) in BUDGETS.items():
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        elapsed = min(profile[module] for profile in profiles)
+        budget *= args.scale
+        problems = [f"imports {name}" for name in forbidden if name in profiles[0]]
+        if elapsed > budget:
+            problems.insert(0, "over budget")
+        failures += bool(problems)
+        result = ", ".join(problems) or "ok"
+        print(f"{module:<36}{elapsed:>8.1f}ms{budget:>8.0f}ms  {result}")
+
+    if failures:
+        print(f"{failures} module(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
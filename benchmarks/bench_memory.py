@@ -0,0 +1,64 @@
+"""Memory footprint of the status kept per unit.
+
+Compares keeping the whole decoded json of each unit (what devices did
+before status snapshots) with keeping a StatusSnapshot.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory [--units 10000]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from benchmarks.payloads import AIRLEAF_PAYLOAD, TWOPOINTZERO_PAYLOAD
+from innova_controls.airleaf import AirLeaf
+from innova_controls.twopointzero import TwoPointZero
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def raw_dicts(payload: bytes, units: int) -> list:
+    return [json.loads(payload) for _ in range(units)]
+
+
+def snapshots(device_class, payload: bytes, units: int) -> list:
+    devices = []
+    for _ in range(units):
+        device = device_class(None)
+        device.set_data(json.loads(payload))
+        devices.append(device)
+    return devices
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'Model':<12}{'Raw dict':>16}{'Snapshot':>16}{'Ratio':>8}")
+    for name, device_class, payload in (
+        ("2.0", TwoPointZero, TWOPOINTZERO_PAYLOAD),
+        ("AirLeaf", AirLeaf, AIRLEAF_PAYLOAD),
+    ):
+        before = measure(lambda: raw_dicts(payload, args.units)) / args.units
+        after = measure(lambda: snapshots(device_class, payload, args.units))
+        after /= args.units
+        print(
+            f"{name:<12}{before:>10.0f} B/unit{after:>10.0f} B/unit"
+            f"{before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
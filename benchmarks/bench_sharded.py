@@ -0,0 +1,121 @@
+"""Fleet refresh throughput of ShardedFleet by number of shard processes.
+
+Stub servers run in their own processes (one per core by default) so they
+aren't the bottleneck, and units are spread across them. The fleet is then
+refreshed by a plain InnovaFleet in this process, and by a ShardedFleet
+with an increasing number of shards. Scaling stops at the number of cores.
+
+Run from the repository root:
+    python -m benchmarks.bench_sharded [--units 5000] [--processes 1 2 4]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import time
+
+from aiohttp import ClientSession, TCPConnector
+
+from benchmarks.stub_server import StubServer
+from innova_controls.fleet import InnovaFleet
+from innova_controls.sharded import ShardedFleet
+
+
+def serve_stub(connection) -> None:
+    async def serve() -> None:
+        async with StubServer() as server:
+            connection.send(server.port)
+            await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+
+    asyncio.run(serve())
+
+
+def start_servers(count: int) -> tuple[list, list[int]]:
+    context = multiprocessing.get_context("spawn")
+    servers, ports = [], []
+    for _ in range(count):
+        parent_connection, child_connection = context.Pipe()
+        process = context.Process(
+            target=serve_stub, args=(child_connection,), daemon=True
+        )
+        process.start()
+        servers.append((process, parent_connection))
+        ports.append(parent_connection.recv())
+    return servers, ports
+
+
+def stop_servers(servers: list) -> None:
+    for process, connection in servers:
+        connection.send(None)
+        process.join(5)
+
+
+def hosts(ports: list[int], units: int) -> list[str]:
+    return [f"127.0.0.1:{ports[unit % len(ports)]}/u{unit}" for unit in range(units)]
+
+
+async def single_loop(units: list[str], iterations: int) -> float:
+    connector = TCPConnector(limit=0, limit_per_host=0)
+    async with ClientSession(connector=connector) as session:
+        fleet = InnovaFleet(session, concurrency=200)
+        for host in units:
+            fleet.add_unit(host)
+        await fleet.async_update()
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await fleet.async_update()
+            timings.append(time.perf_counter() - start)
+    return len(units) / statistics.median(timings)
+
+
+async def sharded(units: list[str], processes: int, iterations: int) -> float:
+    fleet = ShardedFleet(processes, concurrency=200)
+    for host in units:
+        fleet.add_unit(host)
+    async with fleet:
+        await fleet.async_update()
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            result = await fleet.async_update()
+            timings.append(time.perf_counter() - start)
+            if result.failed:
+                print(f"  {len(result.failed)} units failed")
+    return len(units) / statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    cores = os.cpu_count() or 1
+    parser.add_argument("--units", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--servers", type=int, default=cores)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, cores} & set(range(1, cores + 1))),
+    )
+    args = parser.parse_args()
+
+    servers, ports = start_servers(args.servers)
+    units = hosts(ports, args.units)
+    try:
+        print(f"{args.units} units, {cores} cores, {args.servers} stub servers")
+        baseline = asyncio.run(single_loop(units, args.iterations))
+        print(f"{'Single loop':<16}{baseline:>12.0f} units/s")
+        for processes in args.processes:
+            throughput = asyncio.run(sharded(units, processes, args.iterations))
+            print(
+                f"{f'{processes} shards':<16}{throughput:>12.0f} units/s"
+                f"{throughput / baseline:>8.2f}x"
+            )
+    finally:
+        stop_servers(servers)
+
+
+if __name__ == "__main__":
+    main()
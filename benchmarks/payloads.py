@@ -0,0 +1,98 @@
+"""Sample status payloads, as returned by the units (see README.md)"""
+
+import json
+
+TWOPOINTZERO_STATUS = {
+    "RESULT": {
+        "a": [],
+        "cci": 0,
+        "ccv": 0,
+        "cfg_lastWorkingMode": 4,
+        "cloudConfig": 1,
+        "cloudStatus": 4,
+        "cm": 0,
+        "connectionStatus": 2,
+        "coolingDisabled": 0,
+        "cp": 0,
+        "daynumber": 0,
+        "fr": 7,
+        "fs": 0,
+        "heap": 11760,
+        "heatingDisabled": 1,
+        "heatingResistance": 0,
+        "hotelMode": 0,
+        "inputFlags": 0,
+        "kl": 0,
+        "lastRefresh": 3956,
+        "ncc": 0,
+        "nm": 0,
+        "ns": 0,
+        "ps": 0,
+        "pwd": "************",
+        "sp": 26,
+        "t": 16,
+        "timerStatus": 0,
+        "uptime": 159660,
+        "uscm": 0,
+        "wm": 4,
+    },
+    "UID": "06:1A:02:0A:E4:8D",
+    "deviceType": "001",
+    "net": {
+        "dhcp": "1",
+        "gw": "192.168.1.1",
+        "ip": "192.168.1.155",
+        "sub": "255.255.255.0",
+    },
+    "setup": {"name": "Device Name", "serial": "IN1212121"},
+    "success": True,
+    "sw": {"V": "1.0.42"},
+    "time": {"d": 5, "h": 17, "i": 40, "m": 2, "y": 2022},
+}
+
+AIRLEAF_STATUS = {
+    "success": True,
+    "sw": {"V": "1.0.3"},
+    "UID": "f4:cf:a2:5f:29:ef",
+    "deviceType": "002",
+    "time": {"d": 18, "m": 10, "y": 2022, "h": 6, "i": 14},
+    "net": {
+        "gw": "192.168.1.1",
+        "ip": "192.168.1.156",
+        "sub": "255.255.255.0",
+        "dhcp": "1",
+    },
+    "setup": {"name": "Device Name", "serial": "IN3434343"},
+    "RESULT": {
+        "sp": 200,
+        "wm": 3,
+        "fn": 1,
+        "kl": 0,
+        "lastworkingModeSet": 0,
+        "ps": 0,
+        "cm": 0,
+        "a": [],
+        "ta": 210,
+        "tw": 219,
+        "ns": 0,
+        "cloudStatus": 4,
+        "connectionStatus": 2,
+        "cloudConfig": 1,
+        "timerStatus": 0,
+        "inputFlags": 0,
+        "ncc": 0,
+        "lcc": 0,
+        "pwd": "",
+        "heap": 11496,
+        "ccv": 0,
+        "cci": 0,
+        "daynumber": 0,
+        "uptime": 90675,
+        "fclFw": 24,
+        "uscm": 0,
+        "lastRefresh": 2,
+    },
+}
+
+TWOPOINTZERO_PAYLOAD = json.dumps(TWOPOINTZERO_STATUS).encode()
+AIRLEAF_PAYLOAD = json.dumps(AIRLEAF_STATUS).encode()
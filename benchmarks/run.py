@@ -0,0 +1,193 @@
+"""Benchmark suite for status parsing, command latency and fleet throughput.
+
+Runs against an in-process stub server, prints ops/sec with p50/p99
+latencies per case, and saves the results as json so runs can be compared.
+
+Run from the repository root:
+    python -m benchmarks.run [--scale N] [--cases fleet_refresh_100 ...]
+                             [--compare benchmarks/results/<previous>.json]
+"""
+
+import argparse
+import asyncio
+import json
+import pathlib
+import platform
+import statistics
+import time
+
+from aiohttp import ClientSession, TCPConnector
+
+from benchmarks.payloads import TWOPOINTZERO_PAYLOAD
+from benchmarks.stub_server import StubServer
+from innova_controls.decoding import StatusDecoder
+from innova_controls.fleet import InnovaFleet
+from innova_controls.innova import WATCHABLE_PROPERTIES, Innova
+from innova_controls.network_functions import NetWorkFunctions
+from innova_controls.twopointzero import TwoPointZero
+
+RESULTS_DIR = pathlib.Path(__file__).parent / "results"
+
+
+class CaseResult:
+    def __init__(self, name: str, timings: list[float], units: int = 1) -> None:
+        self.name = name
+        self.iterations = len(timings)
+        self.total = sum(timings)
+        ordered = sorted(timings)
+        self.p50 = statistics.median(ordered)
+        self.p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        self.ops_per_sec = self.iterations / self.total if self.total else 0
+        self.units_per_sec = self.ops_per_sec * units
+
+    def as_dict(self) -> dict:
+        return {
+            "iterations": self.iterations,
+            "ops_per_sec": self.ops_per_sec,
+            "units_per_sec": self.units_per_sec,
+            "p50": self.p50,
+            "p99": self.p99,
+        }
+
+
+async def timed(operation, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await operation()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def timed_sync(operation, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def bench_status_decode(server, session, scale) -> CaseResult:
+    decoder = StatusDecoder()
+    timings = timed_sync(lambda: decoder.decode(TWOPOINTZERO_PAYLOAD), 5000 * scale)
+    return CaseResult("status_decode", timings)
+
+
+async def bench_get_status(server, session, scale) -> CaseResult:
+    network = NetWorkFunctions(session, server.host(0))
+    timings = await timed(network.get_status, 200 * scale)
+    return CaseResult("get_status", timings)
+
+
+async def bench_set_data(server, session, scale) -> CaseResult:
+    device = TwoPointZero(None)
+    data = StatusDecoder().decode(TWOPOINTZERO_PAYLOAD)
+    timings = timed_sync(lambda: device.set_data(data), 5000 * scale)
+    return CaseResult("set_data", timings)
+
+
+async def bench_property_access(server, session, scale) -> CaseResult:
+    innova = Innova(session, server.host(0))
+    await innova.async_update()
+
+    def read_all() -> None:
+        for name in WATCHABLE_PROPERTIES:
+            getattr(innova, name)
+
+    timings = timed_sync(read_all, 5000 * scale)
+    return CaseResult("property_access", timings)
+
+
+async def bench_command(server, session, scale) -> CaseResult:
+    innova = Innova(session, server.host(0))
+    await innova.async_update()
+    timings = await timed(lambda: innova.set_temperature(21), 200 * scale)
+    return CaseResult("command_round_trip", timings)
+
+
+def fleet_case(units: int, iterations: int):
+    async def bench_fleet(server, session, scale) -> CaseResult:
+        fleet = InnovaFleet(session, concurrency=100)
+        for unit in range(units):
+            fleet.add_unit(server.host(unit))
+        timings = await timed(fleet.async_update, iterations * scale)
+        return CaseResult(f"fleet_refresh_{units}", timings, units)
+
+    return bench_fleet
+
+
+CASES = {
+    "status_decode": bench_status_decode,
+    "get_status": bench_get_status,
+    "set_data": bench_set_data,
+    "property_access": bench_property_access,
+    "command_round_trip": bench_command,
+    "fleet_refresh_1": fleet_case(1, 100),
+    "fleet_refresh_100": fleet_case(100, 10),
+    "fleet_refresh_1000": fleet_case(1000, 2),
+}
+
+
+async def run(cases: list[str], scale: int) -> list[CaseResult]:
+    results = []
+    async with StubServer() as server:
+        connector = TCPConnector(limit=100)
+        async with ClientSession(connector=connector) as session:
+            for name in cases:
+                results.append(await CASES[name](server, session, scale))
+                print_result(results[-1])
+    return results
+
+
+def print_result(result: CaseResult, previous: dict = None) -> None:
+    line = (
+        f"{result.name:<22}{result.ops_per_sec:>12.1f} ops/s"
+        f"{result.p50 * 1e6:>12.1f} us p50{result.p99 * 1e6:>12.1f} us p99"
+    )
+    if result.units_per_sec != result.ops_per_sec:
+        line += f"{result.units_per_sec:>10.0f} units/s"
+    if previous:
+        change = result.ops_per_sec / previous["ops_per_sec"] - 1
+        line += f"  ({change:+.1%} vs previous)"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument(
+        "--scale", type=int, default=1, help="Multiplier of the iterations"
+    )
+    parser.add_argument("--compare", type=pathlib.Path, help="Previous results")
+    parser.add_argument(
+        "--no-save", action="store_true", help="Don't save the results"
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.cases, args.scale))
+
+    if args.compare:
+        previous = json.loads(args.compare.read_text())["cases"]
+        print(f"\nCompared to {args.compare}:")
+        for result in results:
+            print_result(result, previous.get(result.name))
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cases": {result.name: result.as_dict() for result in results},
+                },
+                indent=2,
+            )
+        )
+        print(f"\nResults saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
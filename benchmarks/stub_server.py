@@ -0,0 +1,48 @@
+"""In-process http server answering like Innova units, for benchmarks.
+
+Every path prefix is a different unit: /u1/api/v/1/status, /u2/api/v/1/status...
+so any number of units can be served on a single port.
+"""
+
+from aiohttp import web
+
+from benchmarks.payloads import TWOPOINTZERO_PAYLOAD
+
+SUCCESS = b'{"success": true}'
+
+
+class StubServer:
+    def __init__(self, payload: bytes = TWOPOINTZERO_PAYLOAD) -> None:
+        self.payload = payload
+        self.port: int = None
+        self._runner: web.AppRunner = None
+
+    def host(self, unit: int) -> str:
+        """Host to give to Innova for a unit of the server"""
+        return f"127.0.0.1:{self.port}/u{unit}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{unit}/api/v/1/status", self._status)
+        app.router.add_post("/{unit}/api/v/1/{command:.*}", self._command)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+    async def __aenter__(self) -> "StubServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _status(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.payload, content_type="application/json")
+
+    async def _command(self, request: web.Request) -> web.Response:
+        return web.Response(body=SUCCESS, content_type="application/json")
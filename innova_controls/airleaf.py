@@ -1,11 +1,14 @@
 from collections.abc import Iterable
 from enum import Enum
+from typing import TYPE_CHECKING
 
 from innova_controls.constants import CMD_LOCK_OFF, CMD_LOCK_ON, CMD_SET_TEMP
 from innova_controls.fan_speed import FanSpeed
 from innova_controls.innova_device import InnovaDevice
 from innova_controls.mode import Mode
-from innova_controls.network_functions import NetWorkFunctions
+
+if TYPE_CHECKING:
+    from innova_controls.network_functions import NetWorkFunctions
 
 
 class AirLeaf(InnovaDevice):
@@ -26,7 +29,9 @@ class AirLeaf(InnovaDevice):
 
         codes = {1: AUTO, 2: NIGHT, 3: MIN, 4: MAX, "fan": None}
 
-    def __init__(self, network_facade: NetWorkFunctions) -> None:
+    STATUS_FIELDS = InnovaDevice.STATUS_FIELDS + ("ta", "sp", "tw", "fn", "kl")
+
+    def __init__(self, network_facade: "NetWorkFunctions") -> None:
         super().__init__(network_facade)
 
     @property
@@ -37,26 +42,29 @@ class AirLeaf(InnovaDevice):
     def temperature_step(self) -> float:
         return 0.5
 
+    @classmethod
+    def _decode_result(cls, result: dict) -> dict:
+        # Temperatures are multiplied by 10 on AirLeaf
+        return {
+            "ambient_temp": result.get("ta", 0) / 10,
+            "target_temperature": result.get("sp", 0) / 10,
+            "water_temperature": result.get("tw", 0) / 10,
+            "fan_code": result.get("fn"),
+            "night_mode": result.get("fn") == cls.Function.NIGHT.value["code"],
+            "keyboard_locked": result.get("kl") == 1,
+        }
+
     @property
     def ambient_temp(self) -> float:
-        if "ta" in self._status:
-            return self._status["ta"] / 10
-        else:
-            return 0
+        return self._snapshot.ambient_temp
 
     @property
     def target_temperature(self) -> float:
-        if "sp" in self._status:
-            return self._status["sp"] / 10
-        else:
-            return 0
+        return self._snapshot.target_temperature
 
     @property
     def water_temperature(self) -> float:
-        if "tw" in self._status:
-            return self._status["tw"] / 10
-        else:
-            return 0
+        return self._snapshot.water_temperature
 
     @property
     def supports_water_temp(self) -> bool:
@@ -64,10 +72,7 @@ class AirLeaf(InnovaDevice):
 
     @property
     def keyboard_locked(self) -> bool:
-        if "kl" in self._status:
-            return self._status["kl"] == 1
-        else:
-            return False
+        return self._snapshot.keyboard_locked
 
     @property
     def supports_keyboard_lock(self) -> bool:
@@ -75,8 +80,8 @@ class AirLeaf(InnovaDevice):
 
     @property
     def fan_speed(self) -> FanSpeed:
-        if "fn" in self._status:
-            fn = self.Function.codes.value[self._status["fn"]]
+        if self._snapshot.fan_code is not None:
+            fn = self.Function.codes.value[self._snapshot.fan_code]
             # Night is not really a fan speed, and is handled by preset
             # so, let fan be labeled as AUTO in this case.
             if fn == self.Function.NIGHT:
@@ -97,16 +102,13 @@ class AirLeaf(InnovaDevice):
 
     @property
     def night_mode(self) -> bool:
-        if "fn" in self._status:
-            if self._status["fn"] == self.Function.NIGHT.value["code"]:
-                return True
-        return False
+        return self._snapshot.night_mode
 
     async def set_temperature(self, temperature: float) -> bool:
         new_temp = temperature * 10
         data = {"temp": new_temp}
         if await self._network_facade.send_command(CMD_SET_TEMP, json=data):
-            self._status["sp"] = new_temp
+            self._update(target_temperature=temperature)
             return True
         return False
 
@@ -120,7 +122,10 @@ class AirLeaf(InnovaDevice):
                 break
 
         if command and await self._network_facade.send_command(command):
-            self._status["fn"] = code
+            self._update(
+                fan_code=code,
+                night_mode=code == self.Function.NIGHT.value["code"],
+            )
             return True
         return False
 
@@ -132,13 +137,13 @@ class AirLeaf(InnovaDevice):
 
     async def night_mode_on(self) -> bool:
         if await self._network_facade.send_command(self.Function.NIGHT.value["cmd"]):
-            self._status["fn"] = self.Function.NIGHT.value["code"]
+            self._update(fan_code=self.Function.NIGHT.value["code"], night_mode=True)
             return True
         return False
 
     async def night_mode_off(self) -> bool:
         if await self._network_facade.send_command(self.Function.AUTO.value["cmd"]):
-            self._status["fn"] = self.Function.AUTO.value["code"]
+            self._update(fan_code=self.Function.AUTO.value["code"], night_mode=False)
             return True
         return False
 
@@ -154,13 +159,13 @@ class AirLeaf(InnovaDevice):
     
     async def lock_keyboard(self) -> bool:
         if await self._network_facade.send_command(CMD_LOCK_ON):
-            self._status["kl"] = 1
+            self._update(keyboard_locked=True)
             return True
         return False
     
     async def unlock_keyboard(self) -> bool:
         if await self._network_facade.send_command(CMD_LOCK_OFF):
-            self._status["kl"] = 0
+            self._update(keyboard_locked=False)
             return True
         return False
 
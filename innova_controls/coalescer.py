@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from innova_controls.constants import (CMD_FAN_SPEED, CMD_FUNCTION_PREFIX,
+                                       CMD_MODE_PREFIX, CMD_SET_TEMP)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def coalescing_slot(command: str) -> str:
+    """Return the last write wins slot of a command, or None if the command
+    must always be sent (power, scheduling, keyboard lock...)"""
+    if command == CMD_SET_TEMP:
+        return "setpoint"
+    if command == CMD_FAN_SPEED:
+        return "fan"
+    if command.startswith(CMD_MODE_PREFIX):
+        return "mode"
+    if command.startswith(CMD_FUNCTION_PREFIX):
+        return "function"
+    return None
+
+
+class _PendingCommand:
+    def __init__(self, future: asyncio.Future) -> None:
+        self.future = future
+        self.send: Callable[[], Awaitable[bool]] = None
+        self.count = 0
+        # Callers currently waiting for the outcome
+        self.waiters = 0
+        self.task: asyncio.Task = None
+
+
+class CommandCoalescer:
+    """Collapses last write wins commands sent within a time window
+
+    The first command of a slot opens a window. Commands of the same slot
+    received during that window replace it, and only the last one is sent
+    when the window closes. Every caller gets the outcome of that command.
+    When every waiting caller is cancelled, the command is dropped, or
+    cancelled if it is being sent.
+
+    Attributes:
+        window: float
+            Seconds to wait for newer commands before sending.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._pending: dict[str, _PendingCommand] = {}
+
+    async def submit(self, slot: str, send: Callable[[], Awaitable[bool]]) -> bool:
+        pending = self._pending.get(slot)
+        if pending is None:
+            pending = _PendingCommand(asyncio.get_running_loop().create_future())
+            self._pending[slot] = pending
+            pending.task = asyncio.ensure_future(self._flush(slot, pending))
+        pending.send = send
+        pending.count += 1
+        pending.waiters += 1
+        try:
+            # Shield the shared command from the cancellation of a single caller
+            return await asyncio.shield(pending.future)
+        finally:
+            pending.waiters -= 1
+            if not pending.waiters and not pending.future.done():
+                self._drop(slot, pending)
+
+    def _drop(self, slot: str, pending: _PendingCommand) -> None:
+        if self._pending.get(slot) is pending:
+            del self._pending[slot]
+        pending.task.cancel()
+        pending.future.cancel()
+        _LOGGER.debug(f"Dropped {slot} command, no caller is waiting for it")
+
+    async def _flush(self, slot: str, pending: _PendingCommand) -> None:
+        await asyncio.sleep(self.window)
+        del self._pending[slot]
+        if pending.count > 1:
+            _LOGGER.debug(f"Coalesced {pending.count} {slot} commands into one")
+        try:
+            pending.future.set_result(await pending.send())
+        except Exception as e:
+            pending.future.set_exception(e)
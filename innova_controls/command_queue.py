@@ -0,0 +1,104 @@
+import asyncio
+import heapq
+import time
+
+# Lower values are served first
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 10
+
+
+class QueueStats:
+    """Counters of a unit queue"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.waited = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.max_depth = 0
+
+    @property
+    def mean_wait_time(self) -> float:
+        """Mean time waited by the requests that had to wait"""
+        return self.wait_time / self.waited if self.waited else 0
+
+    def __repr__(self) -> str:
+        return (
+            f"QueueStats(Requests: {self.requests}, Waited: {self.waited}, "
+            f"Wait Time: {self.wait_time:.3f}s, "
+            f"Max Wait Time: {self.max_wait_time:.3f}s, "
+            f"Max Depth: {self.max_depth})"
+        )
+
+
+class _Slot:
+    def __init__(self, queue: "UnitQueue", priority: int) -> None:
+        self._queue = queue
+        self._priority = priority
+
+    async def __aenter__(self) -> None:
+        await self._queue.acquire(self._priority)
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._queue.release()
+
+
+class UnitQueue:
+    """Serializes the requests sent to one unit
+
+    Units misbehave when they receive several requests at the same time, so
+    only one request per unit is in progress at any time. Waiting requests
+    are served by priority (commands before polls), then in arrival order.
+    Requests to different units are not affected.
+    """
+
+    def __init__(self) -> None:
+        self._busy = False
+        self._waiters: list = []
+        self._sequence = 0
+        self.stats = QueueStats()
+
+    @property
+    def depth(self) -> int:
+        """Number of requests waiting for their turn"""
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    @property
+    def busy(self) -> bool:
+        return self._busy
+
+    def slot(self, priority: int = PRIORITY_COMMAND) -> _Slot:
+        """Async context manager holding the unit for one request"""
+        return _Slot(self, priority)
+
+    async def acquire(self, priority: int = PRIORITY_COMMAND) -> None:
+        self.stats.requests += 1
+        if not self._busy and not self._waiters:
+            self._busy = True
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._sequence += 1
+        heapq.heappush(self._waiters, (priority, self._sequence, waiter))
+        self.stats.max_depth = max(self.stats.max_depth, len(self._waiters))
+        start = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The unit was handed over just before the cancellation
+                self.release()
+            raise
+        waited = time.monotonic() - start
+        self.stats.waited += 1
+        self.stats.wait_time += waited
+        self.stats.max_wait_time = max(self.stats.max_wait_time, waited)
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # Hand the unit over directly, it stays busy
+                waiter.set_result(None)
+                return
+        self._busy = False
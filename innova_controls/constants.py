@@ -11,6 +11,8 @@ CMD_FAN_SPEED = "set/fan"
 CMD_STATUS = "status"
 CMD_LOCK_OFF = "set/lock/off"
 CMD_LOCK_ON = "set/lock/on"
+CMD_MODE_PREFIX = "set/mode/"
+CMD_FUNCTION_PREFIX = "set/function/"
 
 ROTATION_ON = 0
 ROTATION_OFF = 7
@@ -23,4 +25,68 @@ MAX_TEMP = 31
 
 CONNECTION_TIMEOUT = 20
 
+# Seconds a command result is kept over polled values until the unit applies it
+WRITE_CONFIRM_TIMEOUT = 15
+# Suggested Innova confirm_delay, seconds after the last command before polling
+CONFIRM_POLL_DELAY = 3
+
+CLOUD_HOST = "innovaenergie.cloud"
+# Embedded web servers of the units only handle one or two connections at a time
+CONNECTIONS_PER_HOST = 2
+CLOUD_CONNECTIONS = 20
+CONNECTION_LIMIT = 200
+KEEPALIVE_TIMEOUT = 75
+DNS_CACHE_TTL = 600
+# Number of request traces kept in memory by a RequestTracer
+TRACE_EVENTS = 10000
+# Requests per second, and burst size, allowed towards the cloud api
+CLOUD_RATE_LIMIT = 10
+CLOUD_RATE_BURST = 20
+
+RETRY_TRIES = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4
+RETRY_BUDGET = 45
+
 UNKNOWN_MODE = Mode("", -1)
+
+FLEET_CONCURRENCY = 50
+
+DISCOVERY_CONCURRENCY = 128
+DISCOVERY_TIMEOUT = 2
+DISCOVERY_CONNECT_TIMEOUT = 0.5
+
+POLL_INTERVAL = 30
+POLL_BOOST_INTERVAL = 5
+POLL_BOOST_DURATION = 30
+
+# Snapshot fields stored by a MetadataCache, next to the device type
+CACHED_METADATA = ("name", "serial", "uid", "software_version", "ip_address")
+# Seconds a MetadataCache waits for more changes before writing its file
+METADATA_SAVE_DELAY = 2
+
+# Numeric status fields kept by a StatusHistory
+HISTORY_FIELDS = ("ambient_temp", "target_temperature", "water_temperature")
+# Samples kept per unit by default, 12 hours polled every 30 seconds
+HISTORY_CAPACITY = 1440
+
+# Snapshot fields exported by a StatusStream
+EXPORT_FIELDS = (
+    "power",
+    "mode_code",
+    "fan_code",
+    "ambient_temp",
+    "target_temperature",
+    "water_temperature",
+    "rotation",
+    "night_mode",
+    "scheduling_mode",
+    "keyboard_locked",
+)
+EXPORT_QUEUE_SIZE = 1000
+EXPORT_BATCH_SIZE = 500
+# Seconds a partial batch waits for more records before being written
+EXPORT_BATCH_DELAY = 5
+
+# Seconds synchronous calls wait for the loop thread, above RETRY_BUDGET
+SYNC_CALL_TIMEOUT = 60
@@ -0,0 +1,51 @@
+import json
+import logging
+from collections.abc import Callable, Iterable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def default_loads() -> Callable[[bytes], object]:
+    """orjson.loads when orjson is installed, json.loads otherwise"""
+    if orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+class StatusDecoder:
+    """Decodes raw status payloads received from the units
+
+    Attributes:
+        result_fields: Iterable[str]
+            Fields of the RESULT block to keep, usually the STATUS_FIELDS of
+            a device model. All fields are kept when omitted. The whole
+            payload is still parsed, filtering only adds a copy.
+        loads: Callable[[bytes], object]
+            Function parsing the raw payload, see default_loads.
+    """
+
+    def __init__(
+        self,
+        result_fields: Iterable[str] = None,
+        loads: Callable[[bytes], object] = None,
+    ) -> None:
+        self.result_fields = None if result_fields is None else tuple(result_fields)
+        self.loads = loads or default_loads()
+
+    def decode(self, payload: bytes) -> dict:
+        data = self.loads(payload)
+        if (
+            self.result_fields is not None
+            and isinstance(data, dict)
+            and isinstance(data.get("RESULT"), dict)
+        ):
+            result = data["RESULT"]
+            data["RESULT"] = {
+                field: result[field] for field in self.result_fields if field in result
+            }
+        return data
@@ -0,0 +1,196 @@
+"""Discovery of Innova units on local networks.
+
+Also usable from the command line:
+    python -m innova_controls.discovery 192.168.1.0/24 [10.0.0.0/24 ...]
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import logging
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from innova_controls.constants import (CMD_STATUS, DISCOVERY_CONCURRENCY,
+                                       DISCOVERY_CONNECT_TIMEOUT,
+                                       DISCOVERY_TIMEOUT)
+from innova_controls.decoding import default_loads
+from innova_controls.innova_factory import DeviceType, InnovaFactory
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DiscoveredUnit:
+    """An Innova unit answering on the network"""
+
+    def __init__(
+        self,
+        host: str,
+        device_type: DeviceType,
+        name: str = None,
+        serial: str = None,
+        uid: str = None,
+        software_version: str = None,
+    ) -> None:
+        self.host = host
+        self.device_type = device_type
+        self.name = name
+        self.serial = serial
+        self.uid = uid
+        self.software_version = software_version
+
+    def as_dict(self) -> dict:
+        return {
+            "host": self.host,
+            "device_type": self.device_type.value,
+            "model": self.device_type.name,
+            "name": self.name,
+            "serial": self.serial,
+            "uid": self.uid,
+            "software_version": self.software_version,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"DiscoveredUnit(Host: {self.host}, Type: {self.device_type.name}, "
+            f"Name: {self.name}, Serial: {self.serial}, UID: {self.uid})"
+        )
+
+
+def _hosts(networks: Iterable[str]) -> Iterator[str]:
+    for network in networks:
+        network = ipaddress.ip_network(network, strict=False)
+        if network.num_addresses == 1:
+            yield str(network.network_address)
+        else:
+            yield from (str(address) for address in network.hosts())
+
+
+async def probe(
+    http_session: ClientSession,
+    host: str,
+    timeout: ClientTimeout = None,
+) -> DiscoveredUnit:
+    """Return the unit answering at host, or None if it isn't an Innova unit"""
+    url = f"http://{host}/api/v/1/{CMD_STATUS}"
+    try:
+        async with http_session.get(url, timeout=timeout) as r:
+            if r.status != 200:
+                return None
+            data = default_loads()(await r.read())
+        if not isinstance(data, dict) or "RESULT" not in data:
+            return None
+        if not data.get("success"):
+            return None
+        # Same identification as when creating the device of an Innova
+        device_type = InnovaFactory.get_device_type(data.get("deviceType", None))
+    except Exception as e:
+        _LOGGER.debug(f"No Innova unit at {host}: {e!r}")
+        return None
+
+    setup = data.get("setup", {})
+    return DiscoveredUnit(
+        host,
+        device_type,
+        setup.get("name"),
+        setup.get("serial"),
+        data.get("UID"),
+        data.get("sw", {}).get("V"),
+    )
+
+
+async def discover(
+    networks: Iterable[str],
+    http_session: ClientSession = None,
+    concurrency: int = DISCOVERY_CONCURRENCY,
+    timeout: float = DISCOVERY_TIMEOUT,
+    connect_timeout: float = DISCOVERY_CONNECT_TIMEOUT,
+    port: int = None,
+) -> AsyncIterator[DiscoveredUnit]:
+    """Scan networks (like "192.168.1.0/24" or single addresses) for Innova
+    units, yielding them as soon as they answer.
+
+    At most concurrency hosts are probed at the same time. Hosts that don't
+    accept a connection within connect_timeout, or don't answer within
+    timeout, are skipped.
+    """
+    own_session = http_session is None
+    if own_session:
+        http_session = ClientSession(
+            connector=TCPConnector(limit=concurrency, force_close=True)
+        )
+    client_timeout = ClientTimeout(total=timeout, sock_connect=connect_timeout)
+    hosts = _hosts(networks)
+    found: asyncio.Queue = asyncio.Queue()
+
+    async def worker() -> None:
+        # Workers share the host iterator, so only concurrency probes run at once
+        for host in hosts:
+            if port is not None:
+                host = f"{host}:{port}"
+            unit = await probe(http_session, host, client_timeout)
+            if unit is not None:
+                found.put_nowait(unit)
+
+    workers = asyncio.gather(*(worker() for _ in range(concurrency)))
+    workers.add_done_callback(lambda _: found.put_nowait(None))
+    try:
+        while True:
+            unit = await found.get()
+            if unit is None:
+                break
+            yield unit
+        await workers
+    finally:
+        workers.cancel()
+        # Probes must be done before the session they use is closed
+        try:
+            await workers
+        except asyncio.CancelledError:
+            pass
+        if own_session:
+            await http_session.close()
+
+
+async def _discover_main(args: argparse.Namespace) -> int:
+    count = 0
+    async for unit in discover(
+        args.networks,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        connect_timeout=args.connect_timeout,
+        port=args.port,
+    ):
+        count += 1
+        if args.json:
+            print(json.dumps(unit.as_dict()), flush=True)
+        else:
+            print(
+                f"{unit.host:<22}{unit.device_type.name:<14}"
+                f"{unit.serial or '':<12}{unit.uid or '':<19}{unit.name or ''}",
+                flush=True,
+            )
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find Innova units on networks")
+    parser.add_argument("networks", nargs="+", help="Like 192.168.1.0/24")
+    parser.add_argument("--concurrency", type=int, default=DISCOVERY_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=DISCOVERY_TIMEOUT)
+    parser.add_argument(
+        "--connect-timeout", type=float, default=DISCOVERY_CONNECT_TIMEOUT
+    )
+    parser.add_argument("--port", type=int, help="When units aren't on port 80")
+    parser.add_argument("--json", action="store_true", help="One json per line")
+    args = parser.parse_args()
+
+    count = asyncio.run(_discover_main(args))
+    if not args.json:
+        print(f"{count} unit(s) found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from typing import TYPE_CHECKING
+
+from innova_controls.constants import (EXPORT_BATCH_DELAY, EXPORT_BATCH_SIZE,
+                                       EXPORT_FIELDS, EXPORT_QUEUE_SIZE)
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+if TYPE_CHECKING:
+    from innova_controls.fleet import InnovaFleet
+    from innova_controls.innova import Innova
+
+_LOGGER = logging.getLogger(__name__)
+
+# Arrow type of each of the EXPORT_FIELDS, as a pyarrow type factory name
+ARROW_TYPES = {
+    "power": "bool_",
+    "mode_code": "int16",
+    "fan_code": "int16",
+    "ambient_temp": "float32",
+    "target_temperature": "float32",
+    "water_temperature": "float32",
+    "rotation": "bool_",
+    "night_mode": "bool_",
+    "scheduling_mode": "bool_",
+    "keyboard_locked": "bool_",
+}
+
+
+class StatusRecord:
+    """Status of one unit at one poll, limited to the EXPORT_FIELDS
+
+    Values are the ones reported by the unit, values set by commands are
+    only recorded once a poll confirms them.
+    """
+
+    __slots__ = ("timestamp", "unit", "values")
+
+    def __init__(self, timestamp: float, unit: str, values: tuple) -> None:
+        self.timestamp = timestamp
+        self.unit = unit
+        # Values of the EXPORT_FIELDS, in the same order
+        self.values = values
+
+    @classmethod
+    def from_innova(cls, unit: str, innova: "Innova") -> "StatusRecord":
+        snapshot = innova.polled_snapshot()
+        values = tuple(getattr(snapshot, field) for field in EXPORT_FIELDS)
+        return cls(time.time(), unit, values)
+
+    def as_dict(self) -> dict:
+        record = {"timestamp": self.timestamp, "unit": self.unit}
+        record.update(zip(EXPORT_FIELDS, self.values))
+        return record
+
+    def __repr__(self) -> str:
+        return f"StatusRecord(Unit: {self.unit}, Timestamp: {self.timestamp:.3f})"
+
+
+class StatusStream:
+    """Stream of the statuses received by units, one record per update
+
+    Records are queued in a bounded queue and consumed with the records or
+    batches async generators. When the queue is full, the updates of the
+    units wait for the consumer: a slow sink slows polling down instead of
+    growing memory.
+
+    Attributes:
+        max_pending: int
+            Maximum number of records waiting to be consumed.
+    """
+
+    def __init__(self, max_pending: int = EXPORT_QUEUE_SIZE) -> None:
+        self.max_pending = max_pending
+        # Created on first use, so it belongs to the loop that uses it
+        self._record_queue: asyncio.Queue = None
+        self._unsubscribes: dict[str, Callable[[], None]] = {}
+        self._closed = False
+        self.received = 0
+
+    @property
+    def _queue(self) -> asyncio.Queue:
+        if self._record_queue is None:
+            self._record_queue = asyncio.Queue(self.max_pending)
+        return self._record_queue
+
+    def attach_unit(self, unit: str, innova: "Innova") -> None:
+        """Add a record to the stream after every update of a unit"""
+        if unit in self._unsubscribes:
+            return
+
+        async def on_update(innova: "Innova") -> None:
+            if not self._closed:
+                await self._queue.put(StatusRecord.from_innova(unit, innova))
+                self.received += 1
+
+        self._unsubscribes[unit] = innova.subscribe_updates(on_update)
+
+    def detach_unit(self, unit: str) -> None:
+        unsubscribe = self._unsubscribes.pop(unit, None)
+        if unsubscribe:
+            unsubscribe()
+
+    def attach(self, fleet: "InnovaFleet") -> None:
+        """Attach every unit of a fleet"""
+        for unit, innova in fleet.units.items():
+            self.attach_unit(unit, innova)
+
+    def close(self) -> None:
+        """Detach every unit, consumers stop once queued records are read"""
+        for unit in list(self._unsubscribes):
+            self.detach_unit(unit)
+        if not self._closed:
+            self._closed = True
+            # Queued records are still consumed, the marker is read last
+            asyncio.ensure_future(self._queue.put(None))
+
+    @property
+    def pending(self) -> int:
+        return self._record_queue.qsize() if self._record_queue is not None else 0
+
+    async def records(self) -> AsyncIterator[StatusRecord]:
+        while True:
+            record = await self._queue.get()
+            if record is None:
+                return
+            yield record
+
+    def __aiter__(self) -> AsyncIterator[StatusRecord]:
+        return self.records()
+
+    async def batches(
+        self, size: int = EXPORT_BATCH_SIZE, max_delay: float = EXPORT_BATCH_DELAY
+    ) -> AsyncIterator[list[StatusRecord]]:
+        """Records grouped by up to size, a partial batch is yielded once its
+        first record waited max_delay seconds"""
+        loop = asyncio.get_running_loop()
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - loop.time())
+            try:
+                record = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield batch
+                batch, deadline = [], None
+                continue
+            if record is None:
+                if batch:
+                    yield batch
+                return
+            if not batch:
+                deadline = loop.time() + max_delay
+            batch.append(record)
+            if len(batch) >= size:
+                yield batch
+                batch, deadline = [], None
+
+
+class NdjsonSink:
+    """Appends records to a newline delimited json file
+
+    Batches are encoded and written in a worker thread, so the event loop
+    isn't blocked by the disk.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self.written = 0
+
+    def _write(self, lines: str) -> None:
+        self._file.write(lines)
+        self._file.flush()
+
+    async def write(self, batch: Iterable[StatusRecord]) -> None:
+        lines = "".join(
+            json.dumps(record.as_dict(), separators=(",", ":")) + "\n"
+            for record in batch
+        )
+        await asyncio.to_thread(self._write, lines)
+        self.written += len(batch)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._file.close)
+
+
+class ArrowSink:
+    """Writes records to an Arrow IPC file, one record batch per batch
+
+    Requires pyarrow.
+    """
+
+    def __init__(self, path: str) -> None:
+        if pyarrow is None:
+            raise ImportError(f"pyarrow is required for {type(self).__name__}")
+        self.path = path
+        fields = [
+            ("timestamp", pyarrow.timestamp("ms", tz="UTC")),
+            ("unit", pyarrow.string()),
+        ]
+        for field in EXPORT_FIELDS:
+            fields.append((field, getattr(pyarrow, ARROW_TYPES[field])()))
+        self.schema = pyarrow.schema(fields)
+        self._writer = self._open_writer()
+        self.written = 0
+
+    def _open_writer(self):
+        return pyarrow.ipc.new_file(self.path, self.schema)
+
+    def _table(self, batch: list[StatusRecord]):
+        columns = [
+            [int(record.timestamp * 1000) for record in batch],
+            [record.unit for record in batch],
+        ]
+        columns.extend(zip(*(record.values for record in batch)))
+        return pyarrow.Table.from_arrays(
+            [
+                pyarrow.array(column, type=field.type)
+                for column, field in zip(columns, self.schema)
+            ],
+            schema=self.schema,
+        )
+
+    async def write(self, batch: list[StatusRecord]) -> None:
+        if batch:
+            table = self._table(batch)
+            await asyncio.to_thread(self._writer.write_table, table)
+            self.written += len(batch)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._writer.close)
+
+
+class ParquetSink(ArrowSink):
+    """Writes records to a Parquet file, one row group per batch
+
+    Requires pyarrow.
+    """
+
+    def _open_writer(self):
+        return pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+
+async def export(
+    stream: StatusStream,
+    sink,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    max_delay: float = EXPORT_BATCH_DELAY,
+) -> int:
+    """Write the records of a stream to a sink by batches until the stream
+    is closed, then close the sink. Returns the number of records written"""
+    written = 0
+    try:
+        async for batch in stream.batches(batch_size, max_delay):
+            await sink.write(batch)
+            written += len(batch)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"Exported {len(batch)} records to {sink.path}")
+    finally:
+        await sink.close()
+    return written
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
+
+from innova_controls.constants import FLEET_CONCURRENCY
+from innova_controls.fan_speed import FanSpeed
+from innova_controls.innova import Innova
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UnitResult:
+    """Outcome of one operation on a single unit of a fleet"""
+
+    def __init__(
+        self,
+        key: str,
+        success: bool,
+        duration: float,
+        error: str = None,
+        started: float = None,
+    ) -> None:
+        self.key = key
+        self.success = success
+        self.duration = duration
+        self.error = error
+        # Seconds between the start of the whole operation and this unit
+        self.started = started
+
+    def __repr__(self) -> str:
+        return (
+            f"UnitResult(Key: {self.key}, Success: {self.success}, "
+            f"Started: {self.started or 0:.3f}s, "
+            f"Duration: {self.duration:.3f}s, Error: {self.error})"
+        )
+
+
+class FleetResult:
+    """Per unit outcomes of an operation that ran across a fleet"""
+
+    def __init__(self, results: list[UnitResult], duration: float) -> None:
+        self.results = results
+        self.duration = duration
+
+    @property
+    def succeeded(self) -> list[UnitResult]:
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self) -> list[UnitResult]:
+        return [result for result in self.results if not result.success]
+
+    @property
+    def throughput(self) -> float:
+        """Units processed per second during the operation"""
+        if self.duration > 0:
+            return len(self.results) / self.duration
+        return 0
+
+    def __repr__(self) -> str:
+        return (
+            f"FleetResult(Units: {len(self.results)}, "
+            f"Succeeded: {len(self.succeeded)}, Failed: {len(self.failed)}, "
+            f"Duration: {self.duration:.3f}s, "
+            f"Throughput: {self.throughput:.1f} units/s)"
+        )
+
+
+class InnovaFleet:
+    """This is a class to control many Innova units sharing one http session
+
+    Units are refreshed concurrently, so a fleet refresh takes about as long
+    as the slowest unit rather than the sum of all of them.
+
+    Attributes:
+        http_session: ClientSession
+            Session shared by every unit of the fleet.
+        concurrency: int
+            Maximum number of units talked to at the same time.
+        unit_options: dict
+            Keyword arguments given to every Innova of the fleet (retry_policy,
+            status_max_age, metrics...).
+    """
+
+    def __init__(
+        self,
+        http_session: "ClientSession",
+        concurrency: int = FLEET_CONCURRENCY,
+        unit_options: dict = None,
+    ) -> None:
+        self._http_session = http_session
+        self._concurrency = concurrency
+        self._unit_options = unit_options or {}
+        self._units: dict[str, Innova] = {}
+
+    def add_unit(
+        self,
+        host: str = None,
+        serial: str = None,
+        uid: str = None,
+        http_session: "ClientSession" = None,
+    ) -> Innova:
+        """Add a unit to the fleet, keyed by its host in local mode or by
+        its serial number in cloud mode. http_session defaults to the
+        session of the fleet"""
+        key = host if host is not None else serial
+        if key in self._units:
+            return self._units[key]
+        innova = Innova(
+            http_session or self._http_session,
+            host,
+            serial,
+            uid,
+            **self._unit_options,
+        )
+        self._units[key] = innova
+        return innova
+
+    def remove_unit(self, key: str) -> None:
+        self._units.pop(key, None)
+
+    @property
+    def units(self) -> dict[str, Innova]:
+        return self._units
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    def __iter__(self) -> Iterator[Innova]:
+        return iter(self._units.values())
+
+    def __getitem__(self, key: str) -> Innova:
+        return self._units[key]
+
+    async def async_update(
+        self, keys: Iterable[str] = None, concurrency: int = None
+    ) -> FleetResult:
+        """Refresh the status of every unit (or only the given ones)"""
+        result = await self.execute(
+            lambda innova: innova.async_update(), keys, concurrency
+        )
+        _LOGGER.debug(f"Fleet refresh done: {result}")
+        return result
+
+    async def execute(
+        self,
+        operation: Callable[[Innova], Awaitable[bool]],
+        keys: Iterable[str] = None,
+        concurrency: int = None,
+        stagger: float = 0,
+        deadline: float = None,
+    ) -> FleetResult:
+        """Run operation(innova) on every unit (or only the given ones)
+
+        Attributes:
+            concurrency: int
+                Maximum number of units processed at the same time, defaults
+                to the concurrency of the fleet.
+            stagger: float
+                Minimum seconds between the start of two units, in the order
+                of keys. Avoids the electrical inrush of many units powering
+                on together.
+            deadline: float
+                Seconds allowed for the whole batch. Units not done by then
+                are cancelled, along with their requests, and reported as
+                failed. A command already sent may still have been applied.
+        """
+        # Keys are iterated twice, once to start the tasks and once for results
+        keys = list(self._units) if keys is None else list(keys)
+        semaphore = asyncio.Semaphore(concurrency or self._concurrency)
+        start = time.monotonic()
+
+        async def run_one(index: int, key: str) -> UnitResult:
+            if stagger:
+                await asyncio.sleep(start + index * stagger - time.monotonic())
+            async with semaphore:
+                unit_start = time.monotonic()
+                try:
+                    success = bool(await operation(self._units[key]))
+                    error = None
+                except Exception as e:
+                    _LOGGER.error(f"Error while processing unit {key}: {e}")
+                    success = False
+                    error = str(e)
+                return UnitResult(
+                    key,
+                    success,
+                    time.monotonic() - unit_start,
+                    error,
+                    unit_start - start,
+                )
+
+        tasks = [
+            asyncio.ensure_future(run_one(index, key)) for index, key in enumerate(keys)
+        ]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=deadline)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for key, task in zip(keys, tasks):
+            if task.done() and not task.cancelled():
+                results.append(task.result())
+            else:
+                results.append(
+                    UnitResult(
+                        key, False, time.monotonic() - start, "Deadline exceeded"
+                    )
+                )
+        return FleetResult(results, time.monotonic() - start)
+
+    async def power_on(self, keys: Iterable[str] = None, **options) -> FleetResult:
+        """Power units on. options are the ones of execute, a stagger is
+        recommended when powering on many units"""
+        return await self.execute(lambda innova: innova.power_on(), keys, **options)
+
+    async def power_off(self, keys: Iterable[str] = None, **options) -> FleetResult:
+        return await self.execute(lambda innova: innova.power_off(), keys, **options)
+
+    async def set_temperature(
+        self, temperature: float, keys: Iterable[str] = None, **options
+    ) -> FleetResult:
+        return await self.execute(
+            lambda innova: innova.set_temperature(temperature), keys, **options
+        )
+
+    async def set_fan_speed(
+        self, speed: FanSpeed, keys: Iterable[str] = None, **options
+    ) -> FleetResult:
+        return await self.execute(
+            lambda innova: innova.set_fan_speed(speed), keys, **options
+        )
+
+    async def set_heating(self, keys: Iterable[str] = None, **options) -> FleetResult:
+        return await self.execute(lambda innova: innova.set_heating(), keys, **options)
+
+    async def set_cooling(self, keys: Iterable[str] = None, **options) -> FleetResult:
+        return await self.execute(lambda innova: innova.set_cooling(), keys, **options)
+
+    async def set_dehumidifying(
+        self, keys: Iterable[str] = None, **options
+    ) -> FleetResult:
+        return await self.execute(
+            lambda innova: innova.set_dehumidifying(), keys, **options
+        )
+
+    async def set_fan_only(self, keys: Iterable[str] = None, **options) -> FleetResult:
+        return await self.execute(
+            lambda innova: innova.set_fan_only(), keys, **options
+        )
+
+    async def set_auto(self, keys: Iterable[str] = None, **options) -> FleetResult:
+        return await self.execute(lambda innova: innova.set_auto(), keys, **options)
+
+    async def set_scheduling_on(
+        self, keys: Iterable[str] = None, **options
+    ) -> FleetResult:
+        return await self.execute(
+            lambda innova: innova.set_scheduling_on(), keys, **options
+        )
+
+    async def set_scheduling_off(
+        self, keys: Iterable[str] = None, **options
+    ) -> FleetResult:
+        return await self.execute(
+            lambda innova: innova.set_scheduling_off(), keys, **options
+        )
+
+    async def lock_keyboard(self, keys: Iterable[str] = None, **options) -> FleetResult:
+        return await self.execute(
+            lambda innova: innova.lock_keyboard(), keys, **options
+        )
+
+    async def unlock_keyboard(
+        self, keys: Iterable[str] = None, **options
+    ) -> FleetResult:
+        return await self.execute(
+            lambda innova: innova.unlock_keyboard(), keys, **options
+        )
@@ -0,0 +1,246 @@
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING
+
+from innova_controls.mode import Mode
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if TYPE_CHECKING:
+    from innova_controls.fleet import InnovaFleet
+    from innova_controls.innova import Innova
+
+# Values of the mode column, modes codes differ between models
+MODE_KINDS = ("heating", "cooling", "dehumidifying", "fan_only", "auto")
+UNKNOWN = -1
+
+# Snapshot fields kept in the columns
+_WATCHED_FIELDS = (
+    "power",
+    "mode_code",
+    "fan_code",
+    "ambient_temp",
+    "target_temperature",
+    "water_temperature",
+)
+_TEMPERATURES = ("ambient_temp", "target_temperature", "water_temperature")
+
+
+def mode_kind(mode: Mode) -> int:
+    """Index of a mode in MODE_KINDS, UNKNOWN if it has no known kind"""
+    for index, flag in enumerate(
+        (
+            mode.is_heating,
+            mode.is_cooling,
+            mode.is_dehumidifying,
+            mode.is_fan_only,
+            mode.is_auto,
+        )
+    ):
+        if flag:
+            return index
+    return UNKNOWN
+
+
+class FleetState:
+    """Columnar view of the status of the units of a fleet
+
+    Each unit is a row of numpy arrays (power, mode, fan_speed, ambient_temp,
+    target_temperature, water_temperature, group). Rows are refreshed in
+    place from the snapshot of a unit after each of its updates and
+    commands, so they show the same values as the Innova properties, and
+    queries are vectorized over the whole fleet instead of reading
+    properties of every Innova.
+    Unknown values are NaN for temperatures and UNKNOWN for codes.
+
+    Requires numpy.
+
+    Attributes:
+        fleet: InnovaFleet
+            Units to add right away, see sync for units added later.
+        capacity: int
+            Initial number of rows, grown when needed.
+    """
+
+    def __init__(self, fleet: "InnovaFleet" = None, capacity: int = 64) -> None:
+        if numpy is None:
+            raise ImportError("numpy is required for FleetState")
+        self._size = 0
+        self._keys: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._unsubscribes: dict[str, tuple[Callable[[], None], ...]] = {}
+        self._group_labels: list[Hashable] = []
+        self._group_codes: dict[Hashable, int] = {}
+        self._allocate(max(1, capacity))
+        if fleet is not None:
+            self.sync(fleet)
+
+    def _allocate(self, capacity: int) -> None:
+        columns = {
+            "power": numpy.zeros(capacity, dtype=numpy.bool_),
+            "mode": numpy.full(capacity, UNKNOWN, dtype=numpy.int8),
+            "fan_speed": numpy.full(capacity, UNKNOWN, dtype=numpy.int8),
+            "group": numpy.full(capacity, UNKNOWN, dtype=numpy.int32),
+        }
+        for field in _TEMPERATURES:
+            columns[field] = numpy.full(capacity, numpy.nan, dtype=numpy.float32)
+        for name, column in getattr(self, "_columns", {}).items():
+            columns[name][: self._size] = column[: self._size]
+        self._columns = columns
+        self._capacity = capacity
+
+    def add_unit(self, key: str, innova: "Innova") -> None:
+        """Add a row for a unit, filled from its current status"""
+        if key in self._rows:
+            return
+        if self._size == self._capacity:
+            self._allocate(self._capacity * 2)
+        row = self._size
+        self._size += 1
+        self._rows[key] = row
+        self._keys.append(key)
+        self._refresh(key, innova)
+
+        def refresh(innova: "Innova") -> None:
+            self._refresh(key, innova)
+
+        self._unsubscribes[key] = (
+            innova.subscribe_updates(refresh),
+            innova.subscribe_commands(refresh),
+        )
+
+    def remove_unit(self, key: str) -> None:
+        """Remove the row of a unit, the last row takes its place"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        for unsubscribe in self._unsubscribes.pop(key):
+            unsubscribe()
+        last = self._size - 1
+        if row != last:
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+            for column in self._columns.values():
+                column[row] = column[last]
+        self._keys.pop()
+        self._size = last
+        for name, column in self._columns.items():
+            column[last] = False if name == "power" else self._empty(column)
+
+    def sync(self, fleet: "InnovaFleet") -> None:
+        """Add the units of the fleet without a row, remove rows of units no
+        longer in the fleet"""
+        for key in [key for key in self._rows if key not in fleet.units]:
+            self.remove_unit(key)
+        for key, innova in fleet.units.items():
+            self.add_unit(key, innova)
+
+    @staticmethod
+    def _empty(column):
+        return numpy.nan if column.dtype.kind == "f" else UNKNOWN
+
+    def _refresh(self, key: str, innova: "Innova") -> None:
+        row = self._rows.get(key)
+        if row is None:
+            return
+        snapshot = innova.snapshot()
+        for field in _WATCHED_FIELDS:
+            self._set(row, innova, field, getattr(snapshot, field, None))
+
+    def _set(self, row: int, innova: "Innova", field: str, new) -> None:
+        if field == "power":
+            self._columns["power"][row] = bool(new)
+        elif field == "mode_code":
+            self._columns["mode"][row] = (
+                UNKNOWN if new is None else mode_kind(innova.mode)
+            )
+        elif field == "fan_code":
+            try:
+                speed = int(innova.fan_speed) if new is not None else UNKNOWN
+            except (KeyError, TypeError, ValueError):
+                speed = UNKNOWN
+            self._columns["fan_speed"][row] = speed
+        else:
+            self._columns[field][row] = numpy.nan if new is None else new
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def keys(self) -> list[str]:
+        """Unit keys, in row order"""
+        return self._keys
+
+    def column(self, name: str):
+        """Values of a column for every unit, a view updated in place"""
+        return self._columns[name][: self._size]
+
+    def row(self, key: str) -> int:
+        return self._rows[key]
+
+    def select(self, mask) -> list[str]:
+        """Keys of the units selected by a boolean mask over the rows"""
+        return [self._keys[row] for row in numpy.flatnonzero(mask)]
+
+    def set_group(self, key: str, label: Hashable) -> None:
+        """Put a unit in a group (a floor, a building...) for group_means"""
+        code = self._group_codes.setdefault(label, len(self._group_labels))
+        if code == len(self._group_labels):
+            self._group_labels.append(label)
+        self._columns["group"][self._rows[key]] = code
+
+    def set_groups(self, groups: dict[str, Hashable]) -> None:
+        for key, label in groups.items():
+            self.set_group(key, label)
+
+    def mean(self, field: str, mask=None) -> float:
+        """Mean of a temperature over the units with a value, NaN if none"""
+        values = self.column(field)
+        if mask is not None:
+            values = values[mask]
+        values = values[~numpy.isnan(values)]
+        return float(values.mean()) if len(values) else float("nan")
+
+    def group_means(self, field: str, mask=None) -> dict[Hashable, float]:
+        """Mean of a temperature per group, groups without values omitted"""
+        values = self.column(field)
+        groups = self.column("group")
+        keep = ~numpy.isnan(values) & (groups != UNKNOWN)
+        if mask is not None:
+            keep &= mask
+        labels = len(self._group_labels)
+        counts = numpy.bincount(groups[keep], minlength=labels)
+        sums = numpy.bincount(groups[keep], weights=values[keep], minlength=labels)
+        return {
+            self._group_labels[code]: float(sums[code] / counts[code])
+            for code in numpy.flatnonzero(counts)
+        }
+
+    def mode_counts(self, powered_only: bool = True) -> dict[str, int]:
+        """Number of units per mode kind, of powered on units by default"""
+        modes = self.column("mode")
+        if powered_only:
+            modes = modes[self.column("power")]
+        counts = numpy.bincount(modes[modes != UNKNOWN], minlength=len(MODE_KINDS))
+        return dict(zip(MODE_KINDS, counts.tolist()))
+
+    def setpoint_deviation(self):
+        """Ambient minus target temperature per unit, NaN when unknown"""
+        return self.column("ambient_temp") - self.column("target_temperature")
+
+    def far_from_setpoint(
+        self, threshold: float, powered_only: bool = True
+    ) -> list[str]:
+        """Keys of the units whose ambient is more than threshold degrees
+        away from their target temperature"""
+        with numpy.errstate(invalid="ignore"):
+            mask = numpy.abs(self.setpoint_deviation()) > threshold
+        if powered_only:
+            mask &= self.column("power")
+        return self.select(mask)
+
+    def __repr__(self) -> str:
+        return f"FleetState(Units: {self._size}, Capacity: {self._capacity})"
@@ -0,0 +1,112 @@
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from innova_controls.constants import HISTORY_CAPACITY, HISTORY_FIELDS
+from innova_controls.snapshot import StatusSnapshot
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class StatusHistory:
+    """Fixed capacity history of the numeric status fields of a unit
+
+    Samples are a timestamp (time.time()) and the HISTORY_FIELDS of a
+    status, unsupported or missing values being NaN. Once capacity samples
+    are held, each new sample replaces the oldest one.
+
+    Each column is an array written twice, at i and i + capacity, so the
+    latest samples are always contiguous: windows are memoryviews of the
+    arrays, or numpy arrays sharing their memory, and nothing is copied.
+    Views are only valid until the next append. Memory is fixed at
+    2 * capacity * (8 + 4 * len(HISTORY_FIELDS)) bytes.
+
+    Attributes:
+        capacity: int
+            Number of samples kept.
+    """
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(16 * capacity))
+        self._columns = {
+            field: array("f", bytes(8 * capacity)) for field in HISTORY_FIELDS
+        }
+        self._next = 0
+        self._count = 0
+
+    def append(self, snapshot: StatusSnapshot, timestamp: float = None) -> None:
+        """Add the values of a status, timestamped now by default"""
+        if timestamp is None:
+            timestamp = time.time()
+        low = self._next
+        high = low + self.capacity
+        self._timestamps[low] = self._timestamps[high] = timestamp
+        for field, column in self._columns.items():
+            value = getattr(snapshot, field)
+            column[low] = column[high] = float("nan") if value is None else value
+        self._next = (low + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def clear(self) -> None:
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _bounds(self, start: float = None, end: float = None) -> tuple[int, int]:
+        # Oldest sample first; when full, the oldest is the next one replaced
+        first = self._next if self._count == self.capacity else 0
+        last = first + self._count
+        timestamps = memoryview(self._timestamps)[first:last]
+        low = 0 if start is None else bisect_left(timestamps, start)
+        high = self._count if end is None else bisect_right(timestamps, end)
+        return first + low, first + max(low, high)
+
+    def window(
+        self, start: float = None, end: float = None
+    ) -> dict[str, memoryview]:
+        """Samples timestamped between start and end included, oldest first,
+        as {"timestamp": ..., field: ...} memoryviews of the buffer"""
+        low, high = self._bounds(start, end)
+        views = {"timestamp": memoryview(self._timestamps)[low:high]}
+        for field, column in self._columns.items():
+            views[field] = memoryview(column)[low:high]
+        return views
+
+    def window_arrays(self, start: float = None, end: float = None) -> dict:
+        """Same as window, with numpy arrays sharing the buffer memory.
+        Requires numpy"""
+        if numpy is None:
+            raise ImportError("numpy is required for numpy views of the history")
+        return {
+            name: numpy.frombuffer(view, dtype=view.format)
+            for name, view in self.window(start, end).items()
+        }
+
+    def latest(self) -> dict[str, float]:
+        """Values of the last sample, None when empty"""
+        if not self._count:
+            return None
+        index = (self._next - 1) % self.capacity
+        sample = {"timestamp": self._timestamps[index]}
+        for field, column in self._columns.items():
+            sample[field] = column[index]
+        return sample
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the buffer arrays"""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self._timestamps, *self._columns.values())
+        )
+
+    def __repr__(self) -> str:
+        return f"StatusHistory(Samples: {self._count}/{self.capacity})"
@@ -1,17 +1,52 @@
+import asyncio
+import inspect
 import logging
-from collections.abc import Iterable
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TYPE_CHECKING, Optional
 
-from aiohttp import ClientSession
-
-from innova_controls.constants import UNKNOWN_MODE
+from innova_controls.command_queue import UnitQueue
+from innova_controls.constants import CACHED_METADATA, UNKNOWN_MODE
 from innova_controls.fan_speed import FanSpeed
-from innova_controls.innova_device import InnovaDevice
+from innova_controls.innova_device import InnovaDevice, PendingWrite
 from innova_controls.innova_factory import InnovaFactory
+from innova_controls.metadata_cache import MetadataCache
+from innova_controls.metrics import MetricsSink
 from innova_controls.mode import Mode
-from innova_controls.network_functions import NetWorkFunctions
+from innova_controls.snapshot import StatusSnapshot
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+    from innova_controls.history import StatusHistory
+    from innova_controls.network_functions import RetryPolicy
 
 _LOGGER = logging.getLogger(__name__)
 
+# Properties that can be watched with Innova.subscribe
+WATCHABLE_PROPERTIES = (
+    "ambient_temp",
+    "water_temp",
+    "target_temperature",
+    "power",
+    "mode",
+    "rotation",
+    "fan_speed",
+    "night_mode",
+    "scheduling_mode",
+    "keyboard_locked",
+    "name",
+    "software_version",
+    "ip_address",
+)
+
+# Device attribute read for the watchable properties with another name
+_DEVICE_PROPERTIES = {"water_temp": "water_temperature"}
+
+ChangeCallback = Callable[["Innova", str, object, object], None]
+WriteCallback = Callable[["Innova", str, object, bool], None]
+UpdateCallback = Callable[["Innova"], Optional[Awaitable[None]]]
+CommandCallback = Callable[["Innova"], None]
+
 
 class Innova:
     """This is a class to control Innova heat pump units over http
@@ -27,40 +62,327 @@ class Innova:
             Serial number of the Innova unit (usually looks like INXXXXXXX)
         uid: str)
             The MAC address of the Innova unit.
+
+        retry_policy: RetryPolicy
+            How failed requests are retried, see RetryPolicy for defaults.
+        coalesce_window: float
+            When set, setpoint, fan speed, mode and function commands sent
+            within this many seconds collapse into the last one.
+        status_max_age: float
+            When set, statuses younger than this many seconds are served
+            from a cache instead of being requested again to the unit.
+        metrics: MetricsSink
+            Receives latency and outcome of every request sent to the unit.
+        confirm_delay: float
+            When set, seconds after the last successful command before
+            polling the unit to confirm it applied the commands, like
+            CONFIRM_POLL_DELAY. These polls bypass InnovaFleet concurrency
+            and PollScheduler, which already polls units more often after
+            commands, so leave it unset for scheduled units.
+        metadata_cache: MetadataCache
+            When the cache knows the unit, the device is built from it right
+            away: capabilities and metadata are available before the first
+            update, which can then run in the background. Updates keep the
+            cache current.
+        history_capacity: int
+            When set, the last history_capacity polled temperatures are kept
+            in a fixed size StatusHistory, see the history property.
     """
 
     def __init__(
         self,
-        http_session: ClientSession,
+        http_session: "ClientSession",
         host: str = None,
         serial: str = None,
         uid: str = None,
+        retry_policy: "RetryPolicy" = None,
+        coalesce_window: float = None,
+        status_max_age: float = None,
+        metrics: MetricsSink = None,
+        confirm_delay: float = None,
+        metadata_cache: MetadataCache = None,
+        history_capacity: int = None,
     ):
         _LOGGER.info(
             f"Initialize Innova Controls with host={host}, "
             "serial={serial}, uid={uid}"
         )
 
-        self._network_facade = NetWorkFunctions(http_session, host, serial, uid)
+        # Networking is only imported once a unit is created
+        from innova_controls.network_functions import NetWorkFunctions
+
+        self._network_facade = NetWorkFunctions(
+            http_session,
+            host,
+            serial,
+            uid,
+            retry_policy,
+            coalesce_window,
+            status_max_age,
+            metrics,
+        )
         self._innova_device: InnovaDevice = None
-
-    async def async_update(self) -> bool:
-        data: dict = await self._network_facade.get_status()
+        self._device_type: str = None
+        self._history: "StatusHistory" = None
+        if history_capacity is not None:
+            from innova_controls.history import StatusHistory
+
+            self._history = StatusHistory(history_capacity)
+        self._metadata_cache = metadata_cache
+        if metadata_cache is not None:
+            self._restore(metadata_cache)
+        self._subscriptions: list[tuple[ChangeCallback, frozenset]] = []
+        self._write_subscriptions: list[WriteCallback] = []
+        self._update_subscriptions: list[UpdateCallback] = []
+        self._command_subscriptions: list[CommandCallback] = []
+        self._confirm_delay = confirm_delay
+        self._confirm_handle: asyncio.TimerHandle = None
+        self._confirm_task: asyncio.Task = None
+
+    async def async_update(self, force_refresh: bool = False) -> bool:
+        data: dict = await self._network_facade.get_status(force_refresh)
 
         if data and data["success"] is True:
-            if self._innova_device is None:
-                self._innova_device = InnovaFactory.get_device(
-                    # Some units don't provide deviceType field, default to none, 
-                    data.get("deviceType", None), 
-                    self._network_facade
+            before = self._polled_properties(self._watched_properties())
+            # Some units don't provide deviceType field, default to none
+            device_type = data.get("deviceType", None)
+            if self._innova_device is None or device_type != self._device_type:
+                if self._innova_device is not None:
+                    _LOGGER.info(
+                        f"Unit {self._network_facade.unit_key} reports device "
+                        f"type {device_type}, cached type was {self._device_type}"
+                    )
+                self._set_device(device_type)
+            changes = self._innova_device.set_data(
+                data, self._network_facade.status_requested_at
+            )
+            if self._metadata_cache is not None:
+                self._metadata_cache.put(
+                    self._network_facade.unit_key,
+                    device_type,
+                    self._innova_device.snapshot.as_dict(),
                 )
-            self._innova_device.set_data(data)
-            _LOGGER.debug(f"Received: {data}")
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"Received: {data}")
+            if changes and self._subscriptions:
+                self._notify(changes, before)
+            if self._innova_device.write_outcomes and self._write_subscriptions:
+                self._notify_writes()
+            for callback in list(self._update_subscriptions):
+                try:
+                    result = callback(self)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    _LOGGER.error(f"Error in update callback: {e}")
             return True
         else:
             _LOGGER.error(f"Error retrieving unit status")
             return False
 
+    def _set_device(self, device_type: str) -> None:
+        self._innova_device = InnovaFactory.get_device(
+            device_type, self._network_facade
+        )
+        self._device_type = device_type
+        self._innova_device.history = self._history
+
+    def _restore(self, metadata_cache: MetadataCache) -> None:
+        entry = metadata_cache.get(self._network_facade.unit_key)
+        if not entry:
+            return
+        try:
+            self._set_device(entry.get("deviceType"))
+        except ValueError as e:
+            _LOGGER.warning(f"Ignoring cached device type: {e}")
+            return
+        metadata = entry.get("metadata") or {}
+        self._innova_device.restore(
+            **{field: metadata.get(field) for field in CACHED_METADATA}
+        )
+
+    @property
+    def restored(self) -> bool:
+        """True when the device was built from the metadata cache and no
+        update was received yet"""
+        return (
+            self._innova_device is not None
+            and self._network_facade.status_requested_at is None
+        )
+
+    def subscribe(
+        self, callback: ChangeCallback, fields: Iterable[str] = None
+    ) -> Callable[[], None]:
+        """Call callback(innova, field, old value, new value) when a polled
+        status changes.
+
+        fields are names of properties listed in WATCHABLE_PROPERTIES (mode,
+        fan_speed...) or StatusSnapshot fields (mode_code, fan_code...).
+        Without fields, every watchable property is watched. Changes are
+        those of the polled statuses: a value set by a command is reported
+        once a poll confirms it.
+
+        Returns a function removing the subscription.
+        """
+        subscription = (
+            callback,
+            frozenset(WATCHABLE_PROPERTIES if fields is None else fields),
+        )
+        self._subscriptions.append(subscription)
+
+        def unsubscribe() -> None:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+        return unsubscribe
+
+    def subscribe_writes(self, callback: WriteCallback) -> Callable[[], None]:
+        """Call callback(innova, field, value, confirmed) when a status
+        confirms a value set by a command, or when the unit still reports
+        another value once WRITE_CONFIRM_TIMEOUT expired (the value shown is
+        then reverted to the polled one).
+
+        field is a StatusSnapshot field (mode_code, fan_code, power...).
+        Returns a function removing the subscription.
+        """
+        self._write_subscriptions.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._write_subscriptions:
+                self._write_subscriptions.remove(callback)
+
+        return unsubscribe
+
+    def subscribe_updates(self, callback: UpdateCallback) -> Callable[[], None]:
+        """Call callback(innova) after every successful update, changed or
+        not. When the callback returns an awaitable, the update waits for it,
+        which lets slow consumers hold back polling.
+
+        Returns a function removing the subscription.
+        """
+        self._update_subscriptions.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._update_subscriptions:
+                self._update_subscriptions.remove(callback)
+
+        return unsubscribe
+
+    def subscribe_commands(self, callback: CommandCallback) -> Callable[[], None]:
+        """Call callback(innova) after every successful command, before any
+        status confirms it.
+
+        Returns a function removing the subscription.
+        """
+        self._command_subscriptions.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._command_subscriptions:
+                self._command_subscriptions.remove(callback)
+
+        return unsubscribe
+
+    def _notify_writes(self) -> None:
+        for outcome in self._innova_device.write_outcomes:
+            for callback in list(self._write_subscriptions):
+                try:
+                    callback(self, outcome.field, outcome.value, outcome.confirmed)
+                except Exception as e:
+                    _LOGGER.error(
+                        f"Error in write callback for {outcome.field}: {e}"
+                    )
+
+    def _command_done(self, success: bool) -> bool:
+        """Notify command subscribers and schedule a confirmation poll after
+        a burst of successful commands"""
+        if not success:
+            return success
+        for callback in list(self._command_subscriptions):
+            try:
+                callback(self)
+            except Exception as e:
+                _LOGGER.error(f"Error in command callback: {e}")
+        if self._confirm_delay is not None:
+            if self._confirm_handle:
+                self._confirm_handle.cancel()
+            loop = asyncio.get_running_loop()
+            self._confirm_handle = loop.call_later(
+                self._confirm_delay, self._confirm_writes
+            )
+        return success
+
+    def _confirm_writes(self) -> None:
+        self._confirm_handle = None
+        if self.pending_writes:
+            self._confirm_task = asyncio.ensure_future(
+                self.async_update(force_refresh=True)
+            )
+
+    def _watched_properties(self) -> set:
+        watched = set()
+        for _, fields in self._subscriptions:
+            watched.update(field for field in fields if field in WATCHABLE_PROPERTIES)
+        return watched
+
+    def _polled_properties(self, names: Iterable[str]) -> dict:
+        """Watchable properties as of the last polled status, so values set
+        by commands are compared once confirmed"""
+        if not self._innova_device:
+            return {name: getattr(self, name) for name in names}
+        device = self._innova_device.viewing(self._innova_device.polled)
+        return {
+            name: getattr(device, _DEVICE_PROPERTIES.get(name, name))
+            for name in names
+        }
+
+    def _notify(self, changes: dict, before: dict) -> None:
+        after = self._polled_properties(before)
+        for callback, fields in list(self._subscriptions):
+            for field in fields:
+                if field in after:
+                    old, new = before[field], after[field]
+                    if old == new:
+                        continue
+                elif field in changes:
+                    old, new = changes[field]
+                else:
+                    continue
+                try:
+                    callback(self, field, old, new)
+                except Exception as e:
+                    _LOGGER.error(f"Error in change callback for {field}: {e}")
+
+    def snapshot(self) -> StatusSnapshot:
+        """Immutable, decoded status of the unit, None before the first update"""
+        if self._innova_device:
+            return self._innova_device.snapshot
+        return None
+
+    def polled_snapshot(self) -> StatusSnapshot:
+        """Last status reported by the unit, without the values set by
+        commands and not confirmed yet. None before the first update"""
+        if self._innova_device:
+            return self._innova_device.polled
+        return None
+
+    @property
+    def pending_writes(self) -> dict[str, PendingWrite]:
+        """Values set by commands that no status confirmed yet, by snapshot
+        field"""
+        if self._innova_device:
+            return self._innova_device.pending_writes
+        return {}
+
+    @property
+    def history(self) -> "StatusHistory":
+        """Polled temperatures of the unit, None without history_capacity"""
+        return self._history
+
+    @property
+    def request_queue(self) -> UnitQueue:
+        """Queue serializing the requests sent to the unit, see its stats"""
+        return self._network_facade.queue
+
     @property
     def ambient_temp(self) -> float:
         if self._innova_device:
@@ -189,78 +511,79 @@ class Innova:
 
     async def power_on(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.power_on()
+            return self._command_done(await self._innova_device.power_on())
         return False
 
     async def power_off(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.power_off()
+            return self._command_done(await self._innova_device.power_off())
         return False
 
     async def rotation_on(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.rotation_on()
+            return self._command_done(await self._innova_device.rotation_on())
         return False
 
     async def rotation_off(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.rotation_off()
+            return self._command_done(await self._innova_device.rotation_off())
         return False
 
     async def night_mode_on(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.night_mode_on()
+            return self._command_done(await self._innova_device.night_mode_on())
         return False
 
     async def night_mode_off(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.night_mode_off()
+            return self._command_done(await self._innova_device.night_mode_off())
         return False
 
     async def set_temperature(self, temperature: float) -> bool:
         if self._innova_device:
-            return await self._innova_device.set_temperature(temperature)
+            result = await self._innova_device.set_temperature(temperature)
+            return self._command_done(result)
         return False
 
     async def set_fan_speed(self, speed: FanSpeed) -> bool:
         if self._innova_device:
-            return await self._innova_device.set_fan_speed(speed)
+            return self._command_done(await self._innova_device.set_fan_speed(speed))
         return False
 
     async def set_scheduling_on(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.set_scheduling_on()
+            return self._command_done(await self._innova_device.set_scheduling_on())
         return False
 
     async def set_scheduling_off(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.set_scheduling_off()
+            return self._command_done(await self._innova_device.set_scheduling_off())
         return False
 
     async def lock_keyboard(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.lock_keyboard()
+            return self._command_done(await self._innova_device.lock_keyboard())
         return False
     
     async def unlock_keyboard(self) -> bool:
         if self._innova_device:
-            return await self._innova_device.unlock_keyboard()
+            return self._command_done(await self._innova_device.unlock_keyboard())
         return False
 
     async def set_heating(self) -> bool:
-        return await self._innova_device.set_heating()
+        return self._command_done(await self._innova_device.set_heating())
 
     async def set_cooling(self) -> bool:
-        return await self._innova_device.set_cooling()
+        return self._command_done(await self._innova_device.set_cooling())
 
     async def set_dehumidifying(self) -> bool:
-        return await self._innova_device.set_dehumidifying()
+        return self._command_done(await self._innova_device.set_dehumidifying())
 
     async def set_fan_only(self) -> bool:
-        return await self._innova_device.set_fan_only()
+        return self._command_done(await self._innova_device.set_fan_only())
 
     async def set_auto(self) -> bool:
-        return await self._innova_device.set_auto()
+        return self._command_done(await self._innova_device.set_auto())
 
     @property
     def supports_target_temp(self) -> bool:
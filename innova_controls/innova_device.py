@@ -1,17 +1,49 @@
+import copy
 import logging
+import time
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
 from innova_controls.constants import (CMD_CALENDAR_OFF, CMD_CALENDAR_ON,
                                        CMD_POWER_OFF, CMD_POWER_ON, MAX_TEMP,
-                                       MIN_TEMP, UNKNOWN_MODE)
+                                       MIN_TEMP, UNKNOWN_MODE,
+                                       WRITE_CONFIRM_TIMEOUT)
 from innova_controls.fan_speed import FanSpeed
 from innova_controls.mode import Mode
-from innova_controls.network_functions import NetWorkFunctions
+from innova_controls.snapshot import StatusSnapshot
+
+if TYPE_CHECKING:
+    from innova_controls.history import StatusHistory
+    from innova_controls.network_functions import NetWorkFunctions
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class PendingWrite:
+    """Value set by a command that no status has confirmed yet"""
+
+    def __init__(self, field: str, value) -> None:
+        self.field = field
+        self.value = value
+        self.written_at = time.monotonic()
+
+
+class WriteOutcome:
+    """Whether the unit applied the value set by a command"""
+
+    def __init__(self, field: str, value, confirmed: bool, delay: float) -> None:
+        self.field = field
+        self.value = value
+        self.confirmed = confirmed
+        # Seconds between the command and its confirmation or revert
+        self.delay = delay
+
+    def __repr__(self) -> str:
+        state = "confirmed" if self.confirmed else "reverted"
+        return f"WriteOutcome({self.field}={self.value!r} {state} in {self.delay:.1f}s)"
+
+
 class InnovaDevice(ABC):
     class Modes(ABC):
         codes: dict = None
@@ -27,21 +59,149 @@ class InnovaDevice(ABC):
             else:
                 return UNKNOWN_MODE
 
-    def __init__(self, network_facade: NetWorkFunctions) -> None:
+    # Fields of the RESULT block used by the device, see _decode_result
+    STATUS_FIELDS: tuple = ("ps", "wm", "cm")
+
+    def __init__(self, network_facade: "NetWorkFunctions") -> None:
         super().__init__()
         self._network_facade = network_facade
-        self._data = {}
-        self._status = {}
-
-    def set_data(self, data: dict) -> None:
-        self._data = data
-        if self._data["success"] and "RESULT" in self._data:
-            # We don't need the password, so obfuscate it to avoid exposing it in logs
-            self._data["RESULT"]["pwd"] = "__OBFUSCATED__"
-            _LOGGER.debug(f"Received: {self._data}")
-            self._status = self._data["RESULT"]
+        self._snapshot = self.decode({})
+        # Last status reported by the unit, without the values of commands
+        self._polled = self._snapshot
+        self._changes = {}
+        self._pending: dict[str, PendingWrite] = {}
+        self._write_outcomes: list[WriteOutcome] = []
+        # Polled statuses are recorded in this history when set
+        self.history: "StatusHistory" = None
+
+    def set_data(self, data: dict, requested_at: float = None) -> dict:
+        """Store a new status of the unit.
+
+        The raw status is decoded into a snapshot and not kept. Values set by
+        commands are kept over the polled ones until the unit reports them
+        (confirmed), or until WRITE_CONFIRM_TIMEOUT expires (reverted). A
+        status requested before a command (requested_at, time.monotonic()
+        based) never reverts it.
+
+        Returns the snapshot fields that changed since the previous status,
+        as {field: (old value, new value)}. Changes are those of the polled
+        statuses, so a value set by a command is a change once confirmed.
+        """
+        self._write_outcomes = []
+        if data["success"] and "RESULT" in data:
+            if "pwd" in data["RESULT"]:
+                # We don't need the password, obfuscate it to avoid exposing it
+                data["RESULT"]["pwd"] = "__OBFUSCATED__"
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(f"Received: {data}")
+            polled = self.decode(data)
+            if self.history is not None:
+                self.history.append(polled)
+            self._changes = self._polled.diff(polled)
+            self._polled = polled
+            self._snapshot = self._reconcile(polled, requested_at)
         else:
             _LOGGER.error("Error contacting the unit with response")
+            self._changes = {}
+        return self._changes
+
+    @classmethod
+    def decode(cls, data: dict) -> StatusSnapshot:
+        """Decode a raw status into a snapshot of the fields used by the device"""
+        result = data.get("RESULT", {})
+        setup = data.get("setup", {})
+        return StatusSnapshot(
+            power=result.get("ps") == 1,
+            mode_code=result.get("wm"),
+            scheduling_mode=result.get("cm") == 1,
+            name=setup.get("name"),
+            serial=setup.get("serial"),
+            uid=data.get("UID"),
+            software_version=data.get("sw", {}).get("V"),
+            ip_address=data.get("net", {}).get("ip"),
+            **cls._decode_result(result),
+        )
+
+    @classmethod
+    @abstractmethod
+    def _decode_result(cls, result: dict) -> dict:
+        """Model specific snapshot fields decoded from the RESULT block"""
+        pass
+
+    @property
+    def snapshot(self) -> StatusSnapshot:
+        return self._snapshot
+
+    @property
+    def polled(self) -> StatusSnapshot:
+        """Last status reported by the unit, without unconfirmed writes"""
+        return self._polled
+
+    def viewing(self, snapshot: StatusSnapshot) -> "InnovaDevice":
+        """Copy of the device showing another snapshot, to read the
+        properties of that status"""
+        device = copy.copy(self)
+        device._snapshot = snapshot
+        return device
+
+    @property
+    def changes(self) -> dict:
+        """Snapshot fields changed by the last status, see set_data"""
+        return self._changes
+
+    @property
+    def pending_writes(self) -> dict[str, PendingWrite]:
+        """Values set by commands and not confirmed yet, by snapshot field"""
+        return self._pending
+
+    @property
+    def write_outcomes(self) -> list[WriteOutcome]:
+        """Writes confirmed or reverted by the last status"""
+        return self._write_outcomes
+
+    def restore(self, **fields) -> None:
+        """Seed the snapshot with fields known before the first status, like
+        cached metadata. They are replaced by the next status."""
+        self._snapshot = self._snapshot.replace(**fields)
+        self._polled = self._polled.replace(**fields)
+
+    def _update(self, **fields) -> None:
+        """Apply the expected effect of a successful command to the snapshot"""
+        self._snapshot = self._snapshot.replace(**fields)
+        for field, value in fields.items():
+            self._pending[field] = PendingWrite(field, value)
+
+    def _reconcile(
+        self, snapshot: StatusSnapshot, requested_at: float = None
+    ) -> StatusSnapshot:
+        if not self._pending:
+            return snapshot
+        now = time.monotonic()
+        kept = {}
+        for field, write in list(self._pending.items()):
+            polled = getattr(snapshot, field)
+            if polled == write.value:
+                del self._pending[field]
+                self._write_outcomes.append(
+                    WriteOutcome(field, write.value, True, now - write.written_at)
+                )
+            elif (
+                requested_at is not None and requested_at < write.written_at
+            ) or now - write.written_at < WRITE_CONFIRM_TIMEOUT:
+                # Stale status, or the unit didn't apply the command yet
+                kept[field] = write.value
+            else:
+                del self._pending[field]
+                self._write_outcomes.append(
+                    WriteOutcome(field, write.value, False, now - write.written_at)
+                )
+                _LOGGER.warning(
+                    f"Unit did not apply {field}={write.value!r}, "
+                    f"it reports {polled!r}"
+                )
+        if kept:
+            return snapshot.replace(**kept)
+        return snapshot
 
     @property
     @abstractmethod
@@ -143,8 +303,7 @@ class InnovaDevice(ABC):
 
     async def _set_mode(self, mode: Mode) -> bool:
         if await self._network_facade.send_command(mode.command):
-            self._status["ps"] = 1
-            self._status["wm"] = mode.code
+            self._update(power=True, mode_code=mode.code)
             return True
         return False
 
@@ -158,44 +317,37 @@ class InnovaDevice(ABC):
 
     @property
     def power(self) -> bool:
-        if "ps" in self._status:
-            return self._status["ps"] == 1
-        return False
+        return self._snapshot.power
 
     @property
     def mode(self) -> Mode:
-        if "wm" in self._status:
-            return self.Modes.get_mode(self._status["wm"])
-        else:
-            return UNKNOWN_MODE
+        return self.Modes.get_mode(self._snapshot.mode_code)
 
     @property
     def scheduling_mode(self) -> bool:
-        if "cm" in self._status:
-            return self._status["cm"] == 1
-        return False
+        return self._snapshot.scheduling_mode
 
     async def power_on(self) -> bool:
         if await self._network_facade.send_command(CMD_POWER_ON):
-            self._status["ps"] = 1
+            self._update(power=True)
             return True
         return False
 
     async def power_off(self) -> bool:
         if await self._network_facade.send_command(CMD_POWER_OFF):
-            self._status["ps"] = 0
+            self._update(power=False)
             return True
         return False
 
     async def set_scheduling_on(self) -> bool:
         if await self._network_facade.send_command(CMD_CALENDAR_ON):
-            self._status["cm"] = 1
+            self._update(scheduling_mode=True)
             return True
         return False
 
     async def set_scheduling_off(self) -> bool:
         if await self._network_facade.send_command(CMD_CALENDAR_OFF):
-            self._status["cm"] = 0
+            self._update(scheduling_mode=False)
             return True
         return False
 
@@ -206,33 +358,23 @@ class InnovaDevice(ABC):
 
     @property
     def name(self) -> str:
-        if "setup" in self._data and "name" in self._data["setup"]:
-            return self._data["setup"]["name"]
-        return None
+        return self._snapshot.name
 
     @property
     def serial(self) -> str:
-        if "setup" in self._data and "serial" in self._data["setup"]:
-            return self._data["setup"]["serial"]
-        return None
+        return self._snapshot.serial
 
     @property
     def uid(self) -> str:
-        if "UID" in self._data:
-            return self._data["UID"]
-        return None
+        return self._snapshot.uid
 
     @property
     def software_version(self) -> str:
-        if "sw" in self._data and "V" in self._data["sw"]:
-            return self._data["sw"]["V"]
-        return None
+        return self._snapshot.software_version
 
     @property
     def ip_address(self) -> str:
-        if "net" in self._data and "ip" in self._data["net"]:
-            return self._data["net"]["ip"]
-        return None
+        return self._snapshot.ip_address
 
     @property
     def supports_target_temp(self) -> bool:
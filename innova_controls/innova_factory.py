@@ -1,9 +1,10 @@
 from enum import Enum
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-from innova_controls.airleaf import AirLeaf
-from innova_controls.innova_device import InnovaDevice
-from innova_controls.network_functions import NetWorkFunctions
-from innova_controls.twopointzero import TwoPointZero
+if TYPE_CHECKING:
+    from innova_controls.innova_device import InnovaDevice
+    from innova_controls.network_functions import NetWorkFunctions
 
 
 class DeviceType(Enum):
@@ -11,14 +12,33 @@ class DeviceType(Enum):
     AIRLEAF = "002"
 
 
+# Device class of each type, as (module, class), imported on first use
+DEVICE_CLASSES = {
+    DeviceType.TWOPOINTZERO: ("innova_controls.twopointzero", "TwoPointZero"),
+    DeviceType.AIRLEAF: ("innova_controls.airleaf", "AirLeaf"),
+}
+
+
 class InnovaFactory:
     @staticmethod
-    def get_device(device_type: str, network_facade: NetWorkFunctions) -> InnovaDevice:
+    def get_device_type(device_type: str) -> DeviceType:
+        """DeviceType of a status deviceType field.
+        Raises ValueError for unknown device types"""
         # Default device type is a 2.0
         if not device_type:
             device_type = DeviceType.TWOPOINTZERO.value
+        return DeviceType(device_type)
 
-        if DeviceType(device_type) == DeviceType.TWOPOINTZERO:
-            return TwoPointZero(network_facade)
-        elif DeviceType(device_type) == DeviceType.AIRLEAF:
-            return AirLeaf(network_facade)
+    @staticmethod
+    def get_device_class(device_type: DeviceType) -> type["InnovaDevice"]:
+        """Device class of a DeviceType, its module is only imported once a
+        unit of that type is found"""
+        module_name, class_name = DEVICE_CLASSES[device_type]
+        return getattr(import_module(module_name), class_name)
+
+    @staticmethod
+    def get_device(
+        device_type: str, network_facade: "NetWorkFunctions"
+    ) -> "InnovaDevice":
+        device_type = InnovaFactory.get_device_type(device_type)
+        return InnovaFactory.get_device_class(device_type)(network_facade)
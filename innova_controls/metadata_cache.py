@@ -0,0 +1,135 @@
+import asyncio
+import atexit
+import json
+import logging
+import os
+import tempfile
+
+from innova_controls.constants import CACHED_METADATA, METADATA_SAVE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MetadataCache:
+    """On-disk cache of the device type and static metadata of units
+
+    Entries are keyed by host (local mode) or serial (cloud mode) and hold
+    the deviceType of the unit and the snapshot fields listed in
+    CACHED_METADATA. An Innova given a cache builds its device from it on
+    creation, so capabilities and metadata are served before the first
+    status is received. That first status updates the entry, and replaces
+    the device if the unit reports another device type.
+
+    The file is read on creation and written atomically, at most once every
+    save_delay seconds while an event loop is running, immediately otherwise.
+    Changes still waiting to be written are written by flush, which also
+    runs at interpreter exit. One cache is meant to be shared by every unit
+    of a process.
+
+    Attributes:
+        path: str
+            JSON file holding the cache, created if missing.
+        save_delay: float
+            Seconds to wait for more changes before writing the file.
+    """
+
+    def __init__(self, path: str, save_delay: float = METADATA_SAVE_DELAY) -> None:
+        self.path = path
+        self.save_delay = save_delay
+        self._entries: dict[str, dict] = self._load()
+        self._save_handle: asyncio.TimerHandle = None
+        self._dirty = False
+        # The loop may be gone before the delayed save runs, like at the end
+        # of a short asyncio.run
+        atexit.register(self.flush)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                entries = json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            _LOGGER.warning(f"Ignoring unreadable metadata cache {self.path}: {e}")
+            return {}
+        if not isinstance(entries, dict):
+            _LOGGER.warning(f"Ignoring invalid metadata cache {self.path}")
+            return {}
+        invalid = [
+            key
+            for key, entry in entries.items()
+            if not isinstance(entry, dict)
+            or not isinstance(entry.get("metadata") or {}, dict)
+        ]
+        for key in invalid:
+            del entries[key]
+        if invalid:
+            _LOGGER.warning(
+                f"Ignoring {len(invalid)} invalid entries of metadata cache {self.path}"
+            )
+        return entries
+
+    def get(self, key: str) -> dict:
+        """Entry of a unit, {"deviceType": ..., "metadata": {...}}, or None"""
+        return self._entries.get(key)
+
+    def put(self, key: str, device_type: str, metadata: dict) -> None:
+        """Store the entry of a unit, the file is only written if it changed"""
+        entry = {
+            "deviceType": device_type,
+            "metadata": {field: metadata.get(field) for field in CACHED_METADATA},
+        }
+        if self._entries.get(key) != entry:
+            self._entries[key] = entry
+            self._schedule_save()
+
+    def remove(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._schedule_save()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _schedule_save(self) -> None:
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        if self._save_handle is None:
+            self._save_handle = loop.call_later(self.save_delay, self.save)
+
+    def flush(self) -> None:
+        """Write the changes not written yet, if any"""
+        if self._dirty:
+            self.save()
+
+    def save(self) -> None:
+        """Write the cache now, replacing the file atomically"""
+        if self._save_handle:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self._dirty = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, temp_path = tempfile.mkstemp(
+                prefix=".metadata-", suffix=".tmp", dir=directory
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+                    json.dump(self._entries, temp_file, indent=1, sort_keys=True)
+                    temp_file.flush()
+                    os.fsync(temp_file.fileno())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            _LOGGER.error(f"Error writing metadata cache {self.path}: {e}")
+
+    def __repr__(self) -> str:
+        return f"MetadataCache(Path: {self.path}, Entries: {len(self._entries)})"
@@ -0,0 +1,130 @@
+import bisect
+import math
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILURE = "failure"  # Answered with success: false
+OUTCOME_HTTP_ERROR = "http_error"  # Answered with a non 200 http status
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_CONNECTION_ERROR = "connection_error"
+OUTCOME_ERROR = "error"
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    20,
+    math.inf,
+)
+
+
+class MetricsSink:
+    """Receives metrics of the requests sent by NetWorkFunctions
+
+    This base class ignores everything. Subclass it to forward metrics to a
+    monitoring system, or use InMemoryMetrics.
+    """
+
+    def record_request(
+        self, unit: str, path: str, duration: float, outcome: str
+    ) -> None:
+        """Called once per http request, retries included. path is the
+        command path (power/on, set/setpoint, status...) and outcome one of
+        the OUTCOME_* constants"""
+
+    def record_retry(self, unit: str, path: str, error_kind: str) -> None:
+        """Called when a failed request is about to be retried. error_kind is
+        one of the RetryPolicy.ERROR_* constants"""
+
+
+class Histogram:
+    """Latency histogram with fixed buckets"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q quantile (0 < q <= 1)"""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0
+
+    def __repr__(self) -> str:
+        return (
+            f"Histogram(Count: {self.count}, Mean: {self.mean:.3f}s, "
+            f"p50: <={self.quantile(0.5)}s, p99: <={self.quantile(0.99)}s)"
+        )
+
+
+class InMemoryMetrics(MetricsSink):
+    """Keeps latency histograms and outcome counters in memory, per command
+    path and per unit"""
+
+    def __init__(self) -> None:
+        self.latency_by_path: dict[str, Histogram] = {}
+        self.latency_by_unit: dict[str, Histogram] = {}
+        self.outcomes_by_path: dict[str, dict[str, int]] = {}
+        self.outcomes_by_unit: dict[str, dict[str, int]] = {}
+        self.retries_by_path: dict[str, int] = {}
+        self.retries_by_unit: dict[str, int] = {}
+
+    def record_request(
+        self, unit: str, path: str, duration: float, outcome: str
+    ) -> None:
+        for histograms, key in (
+            (self.latency_by_path, path),
+            (self.latency_by_unit, unit),
+        ):
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram()
+            histogram.observe(duration)
+        for outcomes, key in (
+            (self.outcomes_by_path, path),
+            (self.outcomes_by_unit, unit),
+        ):
+            counters = outcomes.setdefault(key, {})
+            counters[outcome] = counters.get(outcome, 0) + 1
+
+    def record_retry(self, unit: str, path: str, error_kind: str) -> None:
+        self.retries_by_path[path] = self.retries_by_path.get(path, 0) + 1
+        self.retries_by_unit[unit] = self.retries_by_unit.get(unit, 0) + 1
+
+    def error_count(self, unit: str = None, path: str = None) -> int:
+        """Number of requests that didn't succeed, for a unit, a path or all"""
+        if unit is not None:
+            selected = [self.outcomes_by_unit.get(unit, {})]
+        elif path is not None:
+            selected = [self.outcomes_by_path.get(path, {})]
+        else:
+            selected = self.outcomes_by_path.values()
+        return sum(
+            count
+            for counters in selected
+            for outcome, count in counters.items()
+            if outcome != OUTCOME_SUCCESS
+        )
@@ -1,13 +1,153 @@
+import asyncio
 import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
 
-from aiohttp import ClientConnectionError, ClientSession, ServerTimeoutError
-from retry import retry
+from aiohttp import (ClientConnectionError, ClientSession, ClientTimeout,
+                     ServerTimeoutError)
 
-from innova_controls.constants import CMD_STATUS, CONNECTION_TIMEOUT
+from innova_controls.coalescer import CommandCoalescer, coalescing_slot
+from innova_controls.command_queue import (PRIORITY_COMMAND, PRIORITY_POLL,
+                                           UnitQueue)
+from innova_controls.constants import (CLOUD_HOST, CMD_STATUS,
+                                       CONNECTION_TIMEOUT, RETRY_BASE_DELAY,
+                                       RETRY_BUDGET, RETRY_MAX_DELAY,
+                                       RETRY_TRIES)
+from innova_controls.decoding import StatusDecoder
+from innova_controls.metrics import (OUTCOME_CONNECTION_ERROR, OUTCOME_ERROR,
+                                     OUTCOME_FAILURE, OUTCOME_HTTP_ERROR,
+                                     OUTCOME_SUCCESS, OUTCOME_TIMEOUT,
+                                     MetricsSink)
+from innova_controls.rate_limiter import TokenBucket, parse_retry_after
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class HttpServerError(Exception):
+    """Raised when a unit or the cloud answers with an HTTP 5xx status"""
+
+    def __init__(self, status: int) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class HttpThrottledError(HttpServerError):
+    """Raised when the server answers with HTTP 429 Too Many Requests"""
+
+    def __init__(self, retry_after: float = None) -> None:
+        super().__init__(429)
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """Coroutine aware retry policy with exponential backoff and jitter
+
+    Waiting between attempts is done with asyncio.sleep, so a failing unit
+    never blocks the event loop for the other ones.
+
+    Attributes:
+        tries: int
+            Maximum number of attempts, including the first one.
+        base_delay: float
+            Delay before the first retry, doubled on each following retry.
+        max_delay: float
+            Upper bound of a single delay between two attempts.
+        budget: float
+            Maximum time in seconds a call may spend, retries included.
+            No retry is attempted if it would start after the budget.
+        retry_on: set
+            Error kinds that are retried, see the ERROR_* constants.
+    """
+
+    ERROR_TIMEOUT = "timeout"
+    ERROR_CONNECTION = "connection"
+    ERROR_SERVER = "server"
+    ERROR_THROTTLED = "throttled"
+
+    def __init__(
+        self,
+        tries: int = RETRY_TRIES,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        budget: float = RETRY_BUDGET,
+        retry_on: set = None,
+    ) -> None:
+        self.tries = tries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        if retry_on is None:
+            retry_on = {
+                self.ERROR_TIMEOUT,
+                self.ERROR_CONNECTION,
+                self.ERROR_SERVER,
+                self.ERROR_THROTTLED,
+            }
+        self.retry_on = retry_on
+
+    @classmethod
+    def classify(cls, error: Exception) -> str:
+        """Return the kind of a network error, or None if it is not a
+        network error (malformed answer, programming error...)"""
+        # ServerTimeoutError is also a ClientConnectionError, check it first
+        if isinstance(error, (ServerTimeoutError, asyncio.TimeoutError)):
+            return cls.ERROR_TIMEOUT
+        if isinstance(error, ClientConnectionError):
+            return cls.ERROR_CONNECTION
+        if isinstance(error, HttpThrottledError):
+            return cls.ERROR_THROTTLED
+        if isinstance(error, HttpServerError):
+            return cls.ERROR_SERVER
+        return None
+
+    def is_retryable(self, error: Exception) -> bool:
+        return self.classify(error) in self.retry_on
+
+    def backoff(self, attempt: int) -> float:
+        """Delay to wait after the given failed attempt (starting at 1)"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        # Equal jitter: keep half of the delay, randomize the other half
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def run(
+        self,
+        operation: Callable[[], Awaitable],
+        description: str,
+        on_retry: Callable[[str], None] = None,
+    ):
+        """Await operation() until it succeeds, retrying retryable errors.
+        on_retry is called with the error kind before each retry.
+        The last error is raised once the tries or the budget are exhausted"""
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await operation()
+            except Exception as e:
+                if attempt >= self.tries or not self.is_retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                if time.monotonic() - start + delay >= self.budget:
+                    raise
+                _LOGGER.warning(
+                    f"{description} failed ({self.classify(e)}: {e!r}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                if on_retry is not None:
+                    on_retry(self.classify(e))
+                await asyncio.sleep(delay)
+
+
+_ERROR_OUTCOMES = {
+    RetryPolicy.ERROR_TIMEOUT: OUTCOME_TIMEOUT,
+    RetryPolicy.ERROR_CONNECTION: OUTCOME_CONNECTION_ERROR,
+    RetryPolicy.ERROR_SERVER: OUTCOME_HTTP_ERROR,
+    RetryPolicy.ERROR_THROTTLED: OUTCOME_HTTP_ERROR,
+}
+
+
 class NetWorkFunctions:
     def __init__(
         self,
@@ -15,59 +155,203 @@ class NetWorkFunctions:
         host: str = None,
         serial: str = None,
         uid: str = None,
+        retry_policy: RetryPolicy = None,
+        coalesce_window: float = None,
+        status_max_age: float = None,
+        metrics: MetricsSink = None,
     ) -> None:
 
         self._http_session = http_session
+        # Identifies the unit in metrics: host in local mode, serial in cloud mode
+        self.unit_key = host if host is not None else serial
+        self._metrics = metrics
+        self.queue = UnitQueue()
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._coalescer: CommandCoalescer = None
+        if coalesce_window:
+            self._coalescer = CommandCoalescer(coalesce_window)
+        self._status_max_age = status_max_age
+        self._status_cache: dict = None
+        self._status_time = 0.0
+        self._status_request: asyncio.Future = None
+        # Number of callers waiting on each in-flight status request
+        self._status_waiters: dict[asyncio.Future, int] = {}
+        # time.monotonic() at which the last received status was requested
+        self.status_requested_at: float = None
+        # Can be replaced, to use another json parser for instance
+        self.status_decoder = StatusDecoder()
+        self._timeout = ClientTimeout(total=CONNECTION_TIMEOUT)
 
         if host is not None:
             # Setup for local mode
             _LOGGER.debug("Setting up local mode")
             self._api_url = f"http://{host}/api/v/1"
             self._headers = None
+            self._rate_limiter: TokenBucket = None
+            self._rate_limiter_key = None
         else:
             # Setup for cloud mode
             _LOGGER.debug("Setting up cloud mode")
-            self._api_url = "http://innovaenergie.cloud/api/v/1"
+            self._api_url = f"http://{CLOUD_HOST}/api/v/1"
             self._headers = {"X-serial": serial, "X-UID": uid}
+            # All cloud mode units share the limits of the cloud api
+            self._rate_limiter = TokenBucket.for_endpoint(self._api_url)
+            self._rate_limiter_key = serial
+
+    async def _request(self, method: str, path: str, **kwargs) -> tuple:
+        """Send one request and return its http status and decoded json body.
+        The body is only decoded for successful requests.
+
+        Requests to the unit are serialized, commands before status polls"""
+        priority = PRIORITY_POLL if path == CMD_STATUS else PRIORITY_COMMAND
+        async with self.queue.slot(priority):
+            return await self._measured_send(method, path, **kwargs)
+
+    async def _measured_send(self, method: str, path: str, **kwargs) -> tuple:
+        if self._metrics is None:
+            return await self._send(method, path, **kwargs)
+
+        start = time.perf_counter()
+        outcome = OUTCOME_ERROR
+        try:
+            status, body = await self._send(method, path, **kwargs)
+            if status != 200:
+                outcome = OUTCOME_HTTP_ERROR
+            elif isinstance(body, dict) and body.get("success"):
+                outcome = OUTCOME_SUCCESS
+            else:
+                outcome = OUTCOME_FAILURE
+            return status, body
+        except Exception as e:
+            outcome = _ERROR_OUTCOMES.get(RetryPolicy.classify(e), OUTCOME_ERROR)
+            raise
+        finally:
+            self._metrics.record_request(
+                self.unit_key, path, time.perf_counter() - start, outcome
+            )
+
+    def _on_retry(self, path: str) -> Callable[[str], None]:
+        if self._metrics is None:
+            return None
+        return lambda kind: self._metrics.record_retry(self.unit_key, path, kind)
+
+    async def _send(self, method: str, path: str, **kwargs) -> tuple:
+        url = f"{self._api_url}/{path}"
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire(self._rate_limiter_key)
+        async with self._http_session.request(
+            method,
+            url,
+            headers=self._headers,
+            timeout=self._timeout,
+            trace_request_ctx={"unit": self.unit_key, "path": path},
+            **kwargs,
+        ) as r:
+            if r.status == 429:
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                if self._rate_limiter is not None and retry_after is not None:
+                    self._rate_limiter.throttle(retry_after)
+                raise HttpThrottledError(retry_after)
+            if r.status >= 500:
+                raise HttpServerError(r.status)
+            if r.status != 200:
+                return r.status, None
+            body = await r.read()
+            return r.status, self.status_decoder.decode(body)
 
-    @retry(exceptions=Exception, tries=2, delay=2, logger=_LOGGER, log_traceback=True)
     async def send_command(self, command, data=None, json=None) -> bool:
+        if self._coalescer is not None:
+            slot = coalescing_slot(command)
+            if slot is not None:
+                return await self._coalescer.submit(
+                    slot, lambda: self._send_command(command, data, json)
+                )
+        return await self._send_command(command, data, json)
+
+    async def _send_command(self, command, data=None, json=None) -> bool:
         cmd_url = f"{self._api_url}/{command}"
         try:
-            r = await self._http_session.post(
-                cmd_url,
-                data=data,
-                json=json,
-                headers=self._headers,
-                timeout=CONNECTION_TIMEOUT,
+            status, result = await self._retry_policy.run(
+                lambda: self._request("POST", command, data=data, json=json),
+                f"Command {cmd_url}",
+                self._on_retry(command),
             )
-
-            if r.status == 200:
-                result = await r.json(content_type=r.content_type)
-                if result["success"]:
-                    return True
-            return False
-        except ServerTimeoutError:
-            return False
-        except ClientConnectionError:
+            success = status == 200 and bool(result and result["success"])
+            if success:
+                self.invalidate_status()
+            return success
+        except (ServerTimeoutError, asyncio.TimeoutError, ClientConnectionError):
             return False
         except Exception as e:
-            _LOGGER.error(f"Error while sending command {cmd_url}", e)
+            _LOGGER.error(f"Error while sending command {cmd_url}: {e!r}")
             return False
 
-    @retry(exceptions=Exception, tries=2, delay=2, logger=_LOGGER, log_traceback=True)
-    async def get_status(self) -> dict:
+    def invalidate_status(self) -> None:
+        """Forget the cached status, and don't let new callers join a status
+        request that started before now"""
+        self._status_cache = None
+        self._status_request = None
+
+    async def get_status(self, force_refresh: bool = False) -> dict:
+        """Return the unit status, from the cache if it is recent enough.
+
+        Concurrent callers share a single in-flight request. With
+        force_refresh, the cache is bypassed but an in-flight request is
+        still joined since it is at least as recent as the call. The shared
+        request is cancelled once every caller waiting on it is cancelled."""
+        if (
+            not force_refresh
+            and self._status_cache is not None
+            and time.monotonic() - self._status_time < self._status_max_age
+        ):
+            return self._status_cache
+
+        request = self._status_request
+        if request is None:
+            request = asyncio.ensure_future(self._fetch_status())
+            self._status_request = request
+            request.add_done_callback(self._status_request_done)
+        self._status_waiters[request] = self._status_waiters.get(request, 0) + 1
+        try:
+            # Shield the shared request from the cancellation of a single caller
+            return await asyncio.shield(request)
+        finally:
+            waiters = self._status_waiters.pop(request, 1) - 1
+            if waiters:
+                self._status_waiters[request] = waiters
+            elif not request.done():
+                # Every caller gave up, nobody would get the result
+                request.cancel()
+
+    def _status_request_done(self, request: asyncio.Future) -> None:
+        self._status_waiters.pop(request, None)
+        if self._status_request is request:
+            self._status_request = None
+            if (
+                self._status_max_age
+                and not request.cancelled()
+                and request.result() is not None
+            ):
+                self._status_cache = request.result()
+                self._status_time = time.monotonic()
+
+    async def _fetch_status(self) -> dict:
         status_url = f"{self._api_url}/{CMD_STATUS}"
+        requested_at = time.monotonic()
         try:
-            r = await self._http_session.get(
-                status_url, headers=self._headers, timeout=CONNECTION_TIMEOUT
+            status, data = await self._retry_policy.run(
+                lambda: self._request("GET", CMD_STATUS),
+                f"Status {status_url}",
+                self._on_retry(CMD_STATUS),
             )
-            data: dict = await r.json(content_type=r.content_type)
             if data and data["success"] and "RESULT" in data:
+                self.status_requested_at = requested_at
                 return data
             else:
-                _LOGGER.error(f"Error contacting the unit with response {r.text}")
+                _LOGGER.error(
+                    f"Error contacting the unit with response {status}: {data}"
+                )
                 return None
         except Exception as e:
-            _LOGGER.error(f"Error getting status {status_url}", e)
+            _LOGGER.error(f"Error getting status {status_url}: {e!r}")
             return None
@@ -0,0 +1,315 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+
+from innova_controls.constants import (FLEET_CONCURRENCY, POLL_BOOST_DURATION,
+                                       POLL_BOOST_INTERVAL, POLL_INTERVAL)
+from innova_controls.innova import Innova
+from innova_controls.snapshot import StatusSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _ScheduledUnit:
+    def __init__(self, key: str, innova: Innova, interval: float) -> None:
+        self.key = key
+        self.innova = innova
+        self.interval = interval
+        self.boost_until = 0.0
+        self.snapshot: StatusSnapshot = None
+        self.in_flight = False
+        self.unsubscribe: Callable[[], None] = None
+        # Heap entries of an older generation are ignored
+        self.generation = 0
+
+
+class PollStats:
+    """Polling counters of a scheduler
+
+    achieved_rate and target_rate are both measured over the last window
+    seconds, so they can be compared while intervals adapt.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.started_at = time.monotonic()
+        self.window = window
+        self.polls = 0
+        self.failures = 0
+        self.skipped = 0
+        self.changes = 0
+        self.target_rate = 0.0
+        self._recent: deque[float] = deque()
+
+    def record_poll(self) -> None:
+        self.polls += 1
+        self._recent.append(time.monotonic())
+
+    @property
+    def achieved_rate(self) -> float:
+        """Polls per second over the last window seconds"""
+        now = time.monotonic()
+        while self._recent and self._recent[0] < now - self.window:
+            self._recent.popleft()
+        elapsed = min(self.window, now - self.started_at)
+        if elapsed > 0:
+            return len(self._recent) / elapsed
+        return 0
+
+    def __repr__(self) -> str:
+        return (
+            f"PollStats(Polls: {self.polls}, Failures: {self.failures}, "
+            f"Skipped: {self.skipped}, Changes: {self.changes}, "
+            f"Achieved Rate: {self.achieved_rate:.2f}/s, "
+            f"Target Rate: {self.target_rate:.2f}/s)"
+        )
+
+
+class PollScheduler:
+    """Polls units on their own schedule, spread evenly across the interval
+
+    Each unit gets a phase offset inside the interval so requests are spread
+    over time instead of all being sent on the same tick. A unit whose status
+    doesn't change is polled less and less often, up to max_interval, and
+    gets back to the base interval as soon as a change is seen. After a
+    successful command, a unit is polled every boost_interval for
+    boost_duration seconds (see notify_command).
+
+    When polls fall behind (slow units, concurrency exhausted), late polls
+    are skipped and the unit is put back on its next slot instead of piling
+    up requests.
+
+    Attributes:
+        units: Mapping[str, Innova]
+            Units to poll, by key. InnovaFleet.units can be used directly.
+        interval: float
+            Base number of seconds between two polls of a unit.
+        max_interval: float
+            Longest interval used for units whose status doesn't change.
+        concurrency: int
+            Maximum number of polls in progress at the same time.
+    """
+
+    def __init__(
+        self,
+        units: Mapping[str, Innova] = None,
+        interval: float = POLL_INTERVAL,
+        max_interval: float = None,
+        boost_interval: float = POLL_BOOST_INTERVAL,
+        boost_duration: float = POLL_BOOST_DURATION,
+        concurrency: int = FLEET_CONCURRENCY,
+    ) -> None:
+        self.interval = interval
+        self.max_interval = max_interval or interval * 4
+        self.boost_interval = boost_interval
+        self.boost_duration = boost_duration
+        self._concurrency = concurrency
+        self._units: dict[str, _ScheduledUnit] = {}
+        self._heap: list = []
+        self._sequence = 0
+        self._wakeup: asyncio.Event = None
+        self._stopped: asyncio.Event = None
+        self._running = False
+        self._tasks: set = set()
+        self._stats = PollStats(self.max_interval)
+
+        units = units or {}
+        count = len(units)
+        for index, (key, innova) in enumerate(units.items()):
+            self.add_unit(key, innova, index * interval / count)
+
+    def add_unit(self, key: str, innova: Innova, offset: float = None) -> None:
+        """Schedule a unit. Without offset, its first poll is placed in the
+        middle of the largest gap between already scheduled polls"""
+        unit = _ScheduledUnit(key, innova, self.interval)
+        if key in self._units:
+            # Invalidate the heap entries of the replaced unit
+            unit.generation = self._units[key].generation + 1
+        self.remove_unit(key)
+        self._units[key] = unit
+        unit.unsubscribe = innova.subscribe_commands(
+            lambda innova: self.notify_command(key)
+        )
+        if offset is None:
+            offset = self._free_phase()
+        self._push(unit, time.monotonic() + offset)
+
+    def remove_unit(self, key: str) -> None:
+        unit = self._units.pop(key, None)
+        if unit is not None:
+            unit.unsubscribe()
+
+    def notify_command(self, key: str) -> None:
+        """Poll a unit more often for a while, after a command was sent.
+        Called by the successful commands of scheduled units"""
+        unit = self._units.get(key)
+        if unit is None:
+            return
+        now = time.monotonic()
+        unit.boost_until = now + self.boost_duration
+        unit.interval = self.boost_interval
+        if not unit.in_flight:
+            unit.generation += 1
+            self._push(unit, now + self.boost_interval)
+
+    async def run(self) -> None:
+        """Poll units until stop is called"""
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+        semaphore = asyncio.Semaphore(self._concurrency)
+        self._stats = PollStats(self.max_interval)
+        try:
+            while self._running:
+                if not self._heap:
+                    await self._sleep(self.interval)
+                    continue
+
+                due, _, generation, key = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await self._sleep(delay)
+                    continue
+                heapq.heappop(self._heap)
+
+                unit = self._units.get(key)
+                if unit is None or generation != unit.generation:
+                    continue
+                if time.monotonic() - due > unit.interval:
+                    # Too late for this slot, shed it rather than pile up
+                    self._stats.skipped += 1
+                    self._push(unit, self._next_slot(due, unit.interval))
+                    continue
+
+                if not await self._acquire(semaphore):
+                    break
+                if unit.key not in self._units or generation != unit.generation:
+                    # Rescheduled while waiting for a slot
+                    semaphore.release()
+                    continue
+                if time.monotonic() - due > unit.interval:
+                    # Became too late while waiting for a slot
+                    semaphore.release()
+                    self._stats.skipped += 1
+                    self._push(unit, self._next_slot(due, unit.interval))
+                    continue
+
+                unit.in_flight = True
+                task = asyncio.ensure_future(self._poll(unit, due, semaphore))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            self._running = False
+            tasks = list(self._tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def stats(self) -> PollStats:
+        """Polling counters, target_rate being the rate of the current
+        intervals"""
+        self._stats.target_rate = sum(
+            1 / unit.interval for unit in self._units.values()
+        )
+        return self._stats
+
+    def stop(self) -> None:
+        self._running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+            self._stopped.set()
+
+    async def _acquire(self, semaphore: asyncio.Semaphore) -> bool:
+        """Wait for a poll slot, False when stopped first"""
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return True
+        acquire = asyncio.ensure_future(semaphore.acquire())
+        stopped = asyncio.ensure_future(self._stopped.wait())
+        try:
+            await asyncio.wait(
+                (acquire, stopped), return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            stopped.cancel()
+            if not acquire.done():
+                acquire.cancel()
+        if acquire.cancelled():
+            return False
+        if not self._running:
+            semaphore.release()
+            return False
+        return True
+
+    async def _poll(
+        self, unit: _ScheduledUnit, due: float, semaphore: asyncio.Semaphore
+    ) -> None:
+        try:
+            success = await unit.innova.async_update()
+        except Exception as e:
+            _LOGGER.error(f"Error while polling unit {unit.key}: {e}")
+            success = False
+        finally:
+            semaphore.release()
+            unit.in_flight = False
+
+        self._stats.record_poll()
+        if success:
+            snapshot = unit.innova.snapshot()
+            changed = unit.snapshot is not None and snapshot != unit.snapshot
+            unit.snapshot = snapshot
+            if changed:
+                self._stats.changes += 1
+            self._adapt(unit, changed)
+        else:
+            self._stats.failures += 1
+
+        if unit.key in self._units:
+            unit.generation += 1
+            self._push(unit, due + unit.interval)
+
+    def _adapt(self, unit: _ScheduledUnit, changed: bool) -> None:
+        if time.monotonic() < unit.boost_until:
+            unit.interval = self.boost_interval
+        elif changed:
+            unit.interval = self.interval
+        else:
+            unit.interval = min(self.max_interval, unit.interval * 1.5)
+
+    def _push(self, unit: _ScheduledUnit, due: float) -> None:
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, unit.generation, unit.key))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    @staticmethod
+    def _next_slot(due: float, interval: float) -> float:
+        """First slot of the unit phase that is still in the future"""
+        now = time.monotonic()
+        missed = int((now - due) // interval) + 1
+        return due + missed * interval
+
+    def _free_phase(self) -> float:
+        now = time.monotonic()
+        phases = sorted(
+            (due - now) % self.interval
+            for due, _, generation, key in self._heap
+            if key in self._units and self._units[key].generation == generation
+        )
+        if not phases:
+            return 0
+        gaps = [
+            (phases[0] + self.interval - phases[-1], phases[-1])
+        ] + [(b - a, a) for a, b in zip(phases, phases[1:])]
+        size, start = max(gaps)
+        return (start + size / 2) % self.interval
+
+    async def _sleep(self, delay: float) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
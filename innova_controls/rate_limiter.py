@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+
+from innova_controls.constants import CLOUD_RATE_BURST, CLOUD_RATE_LIMIT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: str) -> float:
+    """Return the delay in seconds of a Retry-After header, which is either
+    a number of seconds or an http date. Returns None if it can't be parsed"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiterStats:
+    """Counters of a rate limiter"""
+
+    def __init__(self) -> None:
+        self.acquired = 0
+        self.waited = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.throttled = 0
+        self.wait_time_per_key: dict[str, float] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"RateLimiterStats(Acquired: {self.acquired}, Waited: {self.waited}, "
+            f"Wait Time: {self.wait_time:.3f}s, "
+            f"Max Wait Time: {self.max_wait_time:.3f}s, "
+            f"Throttled: {self.throttled})"
+        )
+
+
+class TokenBucket:
+    """Token bucket rate limiter with fair queuing between keys
+
+    Callers acquire a token before each request. When no token is left,
+    callers wait in one queue per key (usually one key per unit) and queues
+    are served in turn, so a unit sending many requests can't starve the
+    other ones. A throttled answer (HTTP 429) pauses the whole bucket for
+    the delay requested by the server.
+
+    Buckets shared by the whole process are obtained with for_endpoint. A
+    bucket can be used from several event loops running in different
+    threads (see InnovaLoopThread): tokens are shared under a lock, while
+    waiters and their dispatcher stay on the loop of each caller.
+
+    Attributes:
+        rate: float
+            Tokens added per second.
+        capacity: float
+            Maximum number of tokens, i.e. the allowed burst size.
+    """
+
+    _endpoints: dict = {}
+    _endpoints_lock = threading.Lock()
+
+    def __init__(
+        self, rate: float = CLOUD_RATE_LIMIT, capacity: float = CLOUD_RATE_BURST
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        # Waiters and dispatcher of each event loop using the bucket
+        self._waiters: dict[asyncio.AbstractEventLoop, OrderedDict[str, deque]] = {}
+        self._dispatchers: dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+        self.stats = RateLimiterStats()
+
+    @classmethod
+    def for_endpoint(
+        cls,
+        endpoint: str,
+        rate: float = CLOUD_RATE_LIMIT,
+        capacity: float = CLOUD_RATE_BURST,
+    ) -> "TokenBucket":
+        """Return the bucket shared by every caller of an endpoint. The rate
+        and capacity are only used when the bucket doesn't exist yet"""
+        with cls._endpoints_lock:
+            if endpoint not in cls._endpoints:
+                cls._endpoints[endpoint] = cls(rate, capacity)
+            return cls._endpoints[endpoint]
+
+    @property
+    def queued(self) -> int:
+        return sum(
+            len(queue)
+            for waiters in list(self._waiters.values())
+            for queue in list(waiters.values())
+        )
+
+    def throttle(self, delay: float) -> None:
+        """Stop handing out tokens for delay seconds"""
+        with self._lock:
+            self.stats.throttled += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        _LOGGER.warning(f"Throttled by server, pausing requests for {delay:.1f}s")
+
+    async def acquire(self, key: str = None) -> None:
+        loop = asyncio.get_running_loop()
+        if not self._waiters.get(loop) and self._take() == 0:
+            with self._lock:
+                self.stats.acquired += 1
+            return
+
+        future = loop.create_future()
+        waiters = self._waiters.setdefault(loop, OrderedDict())
+        waiters.setdefault(key, deque()).append(future)
+        dispatcher = self._dispatchers.get(loop)
+        if dispatcher is None or dispatcher.done():
+            self._dispatchers[loop] = loop.create_task(self._dispatch(loop))
+
+        start = time.monotonic()
+        await future
+        waited = time.monotonic() - start
+        with self._lock:
+            self.stats.acquired += 1
+            self.stats.waited += 1
+            self.stats.wait_time += waited
+            self.stats.max_wait_time = max(self.stats.max_wait_time, waited)
+            self.stats.wait_time_per_key[key] = (
+                self.stats.wait_time_per_key.get(key, 0.0) + waited
+            )
+
+    def _take(self) -> float:
+        """Take a token, or return the seconds to wait before one is free"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            return 0
+
+    async def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        waiters = self._waiters[loop]
+        try:
+            while waiters:
+                # Round robin between keys: serve the first one, then move it last
+                key, queue = next(iter(waiters.items()))
+                # Skip callers that were cancelled while waiting
+                if not queue[0].done():
+                    delay = self._take()
+                    if delay:
+                        await asyncio.sleep(delay)
+                        continue
+                    queue[0].set_result(None)
+                queue.popleft()
+                if queue:
+                    waiters.move_to_end(key)
+                else:
+                    del waiters[key]
+        finally:
+            # Forget the loop once idle, it may be closed afterwards
+            if not waiters:
+                self._waiters.pop(loop, None)
+                self._dispatchers.pop(loop, None)
@@ -0,0 +1,196 @@
+import logging
+import time
+from types import SimpleNamespace
+
+from aiohttp import (ClientSession, TCPConnector, TraceConfig,
+                     TraceConnectionQueuedEndParams,
+                     TraceConnectionQueuedStartParams,
+                     TraceRequestStartParams)
+
+from innova_controls.constants import (CLOUD_CONNECTIONS, CLOUD_HOST,
+                                       CONNECTION_LIMIT, CONNECTIONS_PER_HOST,
+                                       DNS_CACHE_TTL, KEEPALIVE_TIMEOUT)
+from innova_controls.tracing import RequestTracer
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Connection pool usage counters of one host"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued = 0
+        self.queue_time = 0.0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of requests sent on an already open (warm) connection"""
+        connections = self.connections_created + self.connections_reused
+        if connections:
+            return self.connections_reused / connections
+        return 0
+
+    def __repr__(self) -> str:
+        return (
+            f"PoolStats(Requests: {self.requests}, "
+            f"Created: {self.connections_created}, "
+            f"Reused: {self.connections_reused}, Queued: {self.queued}, "
+            f"Queue Time: {self.queue_time:.3f}s)"
+        )
+
+
+class InnovaSessionFactory:
+    """Creates http sessions with connection pools tuned for Innova units
+
+    Local units get at most a couple of connections each, kept alive between
+    polls so the TCP handshake is only paid once per unit. Cloud mode units
+    share a separate, larger pool towards innovaenergie.cloud, with its DNS
+    resolution cached.
+
+    The factory can be used as an async context manager, closing every
+    session it created on exit.
+
+    Attributes:
+        connections_per_host: int
+            Maximum number of simultaneous connections to a local unit.
+        cloud_connections: int
+            Maximum number of simultaneous connections to the cloud.
+        limit: int
+            Maximum number of simultaneous connections of the local pool.
+        keepalive_timeout: float
+            Seconds an idle connection is kept open for the next request.
+        dns_cache_ttl: int
+            Seconds a resolved cloud address is reused.
+        tracer: RequestTracer
+            When set, records the timings of every request of the sessions.
+    """
+
+    def __init__(
+        self,
+        connections_per_host: int = CONNECTIONS_PER_HOST,
+        cloud_connections: int = CLOUD_CONNECTIONS,
+        limit: int = CONNECTION_LIMIT,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = DNS_CACHE_TTL,
+        tracer: RequestTracer = None,
+    ) -> None:
+        self._connections_per_host = connections_per_host
+        self._cloud_connections = cloud_connections
+        self._limit = limit
+        self._keepalive_timeout = keepalive_timeout
+        self._dns_cache_ttl = dns_cache_ttl
+        self._tracer = tracer
+        self._local_session: ClientSession = None
+        self._cloud_session: ClientSession = None
+        self._stats: dict[str, PoolStats] = {}
+
+    @property
+    def local_session(self) -> ClientSession:
+        """Session to use for units in local mode"""
+        if self._local_session is None or self._local_session.closed:
+            connector = TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._connections_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            self._local_session = self._create_session(connector)
+        return self._local_session
+
+    @property
+    def cloud_session(self) -> ClientSession:
+        """Session to use for units in cloud mode"""
+        if self._cloud_session is None or self._cloud_session.closed:
+            connector = TCPConnector(
+                limit=self._cloud_connections,
+                keepalive_timeout=self._keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self._dns_cache_ttl,
+            )
+            self._cloud_session = self._create_session(connector)
+        return self._cloud_session
+
+    def session_for(self, host: str = None) -> ClientSession:
+        """Session to use for a unit, cloud mode is assumed without host"""
+        if host is None:
+            return self.cloud_session
+        return self.local_session
+
+    @property
+    def stats(self) -> dict[str, PoolStats]:
+        """Pool statistics per host (host:port for local units)"""
+        return self._stats
+
+    @property
+    def cloud_stats(self) -> PoolStats:
+        return self._stats.get(CLOUD_HOST, PoolStats())
+
+    def total_stats(self) -> PoolStats:
+        total = PoolStats()
+        for stats in self._stats.values():
+            total.requests += stats.requests
+            total.connections_created += stats.connections_created
+            total.connections_reused += stats.connections_reused
+            total.queued += stats.queued
+            total.queue_time += stats.queue_time
+        return total
+
+    async def close(self) -> None:
+        for session in (self._local_session, self._cloud_session):
+            if session is not None and not session.closed:
+                await session.close()
+
+    async def __aenter__(self) -> "InnovaSessionFactory":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _create_session(self, connector: TCPConnector) -> ClientSession:
+        trace_configs = [self._trace_config()]
+        if self._tracer is not None:
+            trace_configs.append(self._tracer.trace_config())
+        return ClientSession(connector=connector, trace_configs=trace_configs)
+
+    def _trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        return trace_config
+
+    async def _on_request_start(
+        self, session, context: SimpleNamespace, params: TraceRequestStartParams
+    ) -> None:
+        host = params.url.host
+        if not params.url.is_default_port():
+            host = f"{host}:{params.url.port}"
+        context.pool_stats = self._stats.setdefault(host, PoolStats())
+        context.pool_stats.requests += 1
+
+    async def _on_queued_start(
+        self,
+        session,
+        context: SimpleNamespace,
+        params: TraceConnectionQueuedStartParams,
+    ) -> None:
+        context.queued_at = time.monotonic()
+        context.pool_stats.queued += 1
+
+    async def _on_queued_end(
+        self,
+        session,
+        context: SimpleNamespace,
+        params: TraceConnectionQueuedEndParams,
+    ) -> None:
+        context.pool_stats.queue_time += time.monotonic() - context.queued_at
+
+    async def _on_connection_created(self, session, context, params) -> None:
+        context.pool_stats.connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params) -> None:
+        context.pool_stats.connections_reused += 1
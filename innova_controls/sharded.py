@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import zlib
+from collections.abc import Iterable
+
+from innova_controls.constants import FLEET_CONCURRENCY
+from innova_controls.fleet import FleetResult, InnovaFleet, UnitResult
+from innova_controls.snapshot import StatusSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fields sent back for every unit, in this order, see StatusSnapshot
+SNAPSHOT_FIELDS = StatusSnapshot.__slots__
+
+_UPDATE = "update"
+_EXECUTE = "execute"
+_STOP = "stop"
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Shard of a unit, stable across runs so a unit keeps its process"""
+    return zlib.crc32(key.encode()) % shards
+
+
+def _unit_row(fleet: InnovaFleet, result: UnitResult) -> tuple:
+    innova = fleet.units.get(result.key)
+    snapshot = innova.snapshot() if innova else None
+    values = None
+    if snapshot is not None:
+        values = tuple(getattr(snapshot, field) for field in SNAPSHOT_FIELDS)
+    return (
+        result.key,
+        result.success,
+        result.duration,
+        result.started,
+        result.error,
+        values,
+    )
+
+
+async def _serve_shard(connection, units: list[dict], options: dict) -> None:
+    from innova_controls.session import InnovaSessionFactory
+
+    loop = asyncio.get_running_loop()
+    async with InnovaSessionFactory() as factory:
+        fleet = InnovaFleet(
+            factory.local_session, options["concurrency"], options["unit_options"]
+        )
+        for unit in units:
+            fleet.add_unit(**unit, http_session=factory.session_for(unit["host"]))
+        connection.send(("ready", os.getpid()))
+        while True:
+            message = await loop.run_in_executor(None, connection.recv)
+            operation, keys, command, args, execute_options = message
+            if operation == _STOP:
+                break
+            if operation == _UPDATE:
+                result = await fleet.async_update(keys)
+            else:
+                result = await fleet.execute(
+                    lambda innova: getattr(innova, command)(*args),
+                    keys,
+                    **execute_options,
+                )
+            rows = [_unit_row(fleet, unit_result) for unit_result in result.results]
+            connection.send(("result", result.duration, rows))
+
+
+def _run_shard(connection, units: list[dict], options: dict) -> None:
+    """Entry point of a shard process"""
+    logging.basicConfig(level=options["log_level"])
+    try:
+        asyncio.run(_serve_shard(connection, units, options))
+    except (EOFError, BrokenPipeError):
+        # The parent went away, nothing is left to report to
+        _LOGGER.debug("Parent process closed the connection, stopping shard")
+    except Exception as e:
+        try:
+            connection.send(("error", f"{type(e).__name__}: {e}"))
+        except (BrokenPipeError, OSError):
+            _LOGGER.error(f"Shard failed: {type(e).__name__}: {e}")
+    finally:
+        connection.close()
+
+
+class _Shard:
+    def __init__(self, index: int, process, connection) -> None:
+        self.index = index
+        self.process = process
+        self.connection = connection
+        self.keys: list[str] = []
+        self.lock = asyncio.Lock()
+
+    async def request(self, message: tuple) -> tuple:
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            try:
+                self.connection.send(message)
+                reply = await loop.run_in_executor(None, self.connection.recv)
+            except (EOFError, OSError):
+                reply = ("error", "process exited")
+        if reply[0] == "error":
+            raise RuntimeError(f"Shard {self.index} failed: {reply[1]}")
+        return reply
+
+
+class ShardedFleet:
+    """Fleet split across a pool of processes, for fleets too large for
+    the CPU of a single event loop
+
+    Units are assigned to shards by a stable hash of their key. Each shard
+    process runs its own event loop, InnovaSessionFactory and InnovaFleet,
+    so status decoding and processing use every core. Shards send back one
+    tuple per unit (key, success, duration, started, error and the values of
+    SNAPSHOT_FIELDS), and snapshots are only rebuilt in the parent when
+    asked for.
+
+    Shard processes are spawned, so the main module of the program must be
+    importable without side effects (guarded by if __name__ == "__main__"),
+    and unit_options must be picklable. Use as an async context manager, or
+    call start and close.
+
+    Attributes:
+        processes: int
+            Number of shard processes, one per core by default.
+        concurrency: int
+            Maximum number of units talked to at the same time per shard.
+        unit_options: dict
+            Keyword arguments given to every Innova, see InnovaFleet.
+    """
+
+    def __init__(
+        self,
+        processes: int = None,
+        concurrency: int = FLEET_CONCURRENCY,
+        unit_options: dict = None,
+    ) -> None:
+        self.processes = processes or os.cpu_count() or 1
+        self._concurrency = concurrency
+        self._unit_options = unit_options or {}
+        self._units: dict[str, dict] = {}
+        self._values: dict[str, tuple] = {}
+        self._shards: list[_Shard] = []
+
+    def add_unit(self, host: str = None, serial: str = None, uid: str = None) -> str:
+        """Add a unit before start, returns its key (host or serial)"""
+        if self._shards:
+            raise RuntimeError("Units can't be added to a started ShardedFleet")
+        key = host if host is not None else serial
+        self._units[key] = {"host": host, "serial": serial, "uid": uid}
+        return key
+
+    @property
+    def keys(self) -> list[str]:
+        return list(self._units)
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    async def start(self) -> None:
+        """Start the shard processes and wait until they are ready"""
+        shard_units: list[list[dict]] = [[] for _ in range(self.processes)]
+        shard_keys: list[list[str]] = [[] for _ in range(self.processes)]
+        for key, unit in self._units.items():
+            index = shard_of(key, self.processes)
+            shard_units[index].append(unit)
+            shard_keys[index].append(key)
+        options = {
+            "concurrency": self._concurrency,
+            "unit_options": self._unit_options,
+            "log_level": logging.getLogger().level,
+        }
+        context = multiprocessing.get_context("spawn")
+        for index in range(self.processes):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_run_shard,
+                args=(child_connection, shard_units[index], options),
+                name=f"innova-shard-{index}",
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            shard = _Shard(index, process, parent_connection)
+            shard.keys = shard_keys[index]
+            self._shards.append(shard)
+
+        loop = asyncio.get_running_loop()
+        for shard in self._shards:
+            try:
+                reply = await loop.run_in_executor(None, shard.connection.recv)
+            except EOFError:
+                reply = ("error", "process exited")
+            if reply[0] != "ready":
+                await self.close()
+                raise RuntimeError(f"Shard {shard.index} failed: {reply[1]}")
+        _LOGGER.debug(f"Started {self.processes} shards for {len(self._units)} units")
+
+    async def _run(
+        self,
+        operation: str,
+        keys: Iterable[str] = None,
+        command: str = None,
+        args: tuple = (),
+        options: dict = None,
+    ) -> FleetResult:
+        start = time.monotonic()
+        if keys is None:
+            per_shard = {shard.index: None for shard in self._shards if shard.keys}
+        else:
+            per_shard = {}
+            for key in keys:
+                index = shard_of(key, self.processes)
+                per_shard.setdefault(index, []).append(key)
+        replies = await asyncio.gather(
+            *(
+                self._shards[index].request(
+                    (operation, shard_keys, command, args, options or {})
+                )
+                for index, shard_keys in per_shard.items()
+            )
+        )
+        results = []
+        for _, _, rows in replies:
+            for key, success, duration, started, error, values in rows:
+                results.append(UnitResult(key, success, duration, error, started))
+                if values is not None:
+                    self._values[key] = values
+        return FleetResult(results, time.monotonic() - start)
+
+    async def async_update(self, keys: Iterable[str] = None) -> FleetResult:
+        """Refresh the status of every unit (or only the given ones)"""
+        return await self._run(_UPDATE, keys)
+
+    async def execute(
+        self, command: str, *args, keys: Iterable[str] = None, **options
+    ) -> FleetResult:
+        """Run an Innova command (power_on, set_temperature...) with args on
+        every unit (or only the given ones). options are the ones of
+        InnovaFleet.execute, concurrency and stagger apply per shard."""
+        return await self._run(_EXECUTE, keys, command, args, options)
+
+    def snapshot(self, key: str) -> StatusSnapshot:
+        """Last status received from a unit, None before its first update"""
+        values = self._values.get(key)
+        if values is None:
+            return None
+        return StatusSnapshot(**dict(zip(SNAPSHOT_FIELDS, values)))
+
+    def values(self, field: str) -> dict[str, object]:
+        """Last value of a StatusSnapshot field for every updated unit"""
+        index = SNAPSHOT_FIELDS.index(field)
+        return {key: values[index] for key, values in self._values.items()}
+
+    async def close(self) -> None:
+        """Stop the shard processes"""
+        loop = asyncio.get_running_loop()
+        for shard in self._shards:
+            if shard.process.is_alive():
+                try:
+                    shard.connection.send((_STOP, None, None, (), None))
+                except (BrokenPipeError, OSError):
+                    pass
+            await loop.run_in_executor(None, shard.process.join, 5)
+            if shard.process.is_alive():
+                shard.process.terminate()
+            shard.connection.close()
+        self._shards = []
+
+    async def __aenter__(self) -> "ShardedFleet":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def __repr__(self) -> str:
+        return f"ShardedFleet(Units: {len(self._units)}, Shards: {self.processes})"
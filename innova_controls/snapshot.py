@@ -0,0 +1,70 @@
+class StatusSnapshot:
+    """Immutable status of a unit, decoded once per update
+
+    Only the fields used by the device classes are kept, already converted
+    to their final unit. Fields a model doesn't support are None.
+    """
+
+    __slots__ = (
+        "power",
+        "mode_code",
+        "fan_code",
+        "ambient_temp",
+        "target_temperature",
+        "water_temperature",
+        "rotation",
+        "night_mode",
+        "scheduling_mode",
+        "keyboard_locked",
+        "name",
+        "serial",
+        "uid",
+        "software_version",
+        "ip_address",
+    )
+
+    def __init__(self, **fields) -> None:
+        for field in self.__slots__:
+            object.__setattr__(self, field, fields.pop(field, None))
+        if fields:
+            raise TypeError(f"Unknown status fields: {', '.join(fields)}")
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def replace(self, **changes) -> "StatusSnapshot":
+        """Return a copy of the snapshot with some fields changed"""
+        fields = {field: getattr(self, field) for field in self.__slots__}
+        fields.update(changes)
+        return StatusSnapshot(**fields)
+
+    def diff(self, other: "StatusSnapshot") -> dict:
+        """Fields that differ in other, as {field: (own value, other value)}"""
+        changes = {}
+        for field in self.__slots__:
+            old, new = getattr(self, field), getattr(other, field)
+            if old != new:
+                changes[field] = (old, new)
+        return changes
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StatusSnapshot):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__
+        )
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, field) for field in self.__slots__))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{field}={getattr(self, field)!r}" for field in self.__slots__
+        )
+        return f"StatusSnapshot({fields})"
@@ -0,0 +1,216 @@
+import asyncio
+import atexit
+import concurrent.futures
+import inspect
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Iterable
+
+from innova_controls.constants import SYNC_CALL_TIMEOUT
+from innova_controls.innova import Innova
+from innova_controls.session import InnovaSessionFactory
+from innova_controls.snapshot import StatusSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class InnovaLoopThread:
+    """Event loop running in a background thread, for synchronous code
+
+    The loop and the sessions of its InnovaSessionFactory live as long as
+    the thread, so synchronous callers share warm connection pools instead
+    of paying loop, session and TCP setup on every call. Methods can be
+    called from any thread.
+
+    default() returns a loop thread shared by the whole process, stopped at
+    interpreter exit.
+
+    Attributes:
+        session_factory: InnovaSessionFactory
+            Creates the sessions used by the units, created when omitted.
+        timeout: float
+            Default number of seconds calls wait for their result.
+    """
+
+    _default: "InnovaLoopThread" = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        session_factory: InnovaSessionFactory = None,
+        timeout: float = SYNC_CALL_TIMEOUT,
+    ) -> None:
+        self.session_factory = session_factory or InnovaSessionFactory()
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="innova-loop", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def default(cls) -> "InnovaLoopThread":
+        with cls._default_lock:
+            if cls._default is None or cls._default.closed:
+                cls._default = cls()
+                atexit.register(cls._default.close)
+            return cls._default
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    @property
+    def closed(self) -> bool:
+        return self._loop.is_closed() or not self._thread.is_alive()
+
+    def check_thread(self) -> None:
+        """Raise RuntimeError when called from the loop thread, where waiting
+        for the loop would block it. Call it before creating the coroutine
+        given to run, so it isn't left never awaited"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Synchronous calls can't be made from the loop")
+
+    def run(self, awaitable: Awaitable, timeout: float = None):
+        """Run a coroutine on the loop and wait for its result"""
+        if threading.current_thread() is self._thread:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            self.check_thread()
+        future = asyncio.run_coroutine_threadsafe(awaitable, self._loop)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def batch(
+        self, operations: Iterable[Callable[[], Awaitable]], timeout: float = None
+    ) -> list:
+        """Run many operations concurrently in a single call to the loop.
+
+        operations are functions returning an awaitable, like the ones
+        returned by SyncInnova.call. Results are returned in the same order,
+        an operation that failed gives its exception instead of a result.
+        """
+        self.check_thread()
+        operations = list(operations)
+
+        async def run_all() -> list:
+            return await asyncio.gather(
+                *(operation() for operation in operations), return_exceptions=True
+            )
+
+        return self.run(run_all(), timeout)
+
+    def close(self) -> None:
+        """Close the sessions and stop the thread"""
+        if self.closed:
+            return
+        self.check_thread()
+        try:
+            self.run(self.session_factory.close())
+        except Exception as e:
+            _LOGGER.error(f"Error closing sessions: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "InnovaLoopThread":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SyncInnova:
+    """Synchronous facade of Innova, for code that doesn't run an event loop
+
+    Every Innova property and command is available with the same name,
+    commands blocking until the unit answered. async_update is named update.
+    The unit lives in an InnovaLoopThread (the default one when omitted), so
+    facades can be used from any thread.
+
+    Properties are read without going through the loop: the status is an
+    immutable snapshot replaced at once by updates, so a read never sees a
+    partially updated status.
+
+    Attributes:
+        host, serial, uid:
+            Same as Innova.
+        loop_thread: InnovaLoopThread
+            Loop running the unit, InnovaLoopThread.default() when omitted.
+        options:
+            Other keyword arguments of Innova (retry_policy, metrics...).
+    """
+
+    def __init__(
+        self,
+        host: str = None,
+        serial: str = None,
+        uid: str = None,
+        loop_thread: InnovaLoopThread = None,
+        **options,
+    ) -> None:
+        self.loop_thread = loop_thread or InnovaLoopThread.default()
+        self.loop_thread.check_thread()
+
+        async def create() -> Innova:
+            session = self.loop_thread.session_factory.session_for(host)
+            return Innova(session, host, serial, uid, **options)
+
+        self._innova: Innova = self.loop_thread.run(create())
+
+    @property
+    def innova(self) -> Innova:
+        """The underlying Innova, only to be used from the loop thread"""
+        return self._innova
+
+    def call(self, command: str, *args, **kwargs) -> Callable[[], Awaitable]:
+        """Operation running an Innova command, for InnovaLoopThread.batch"""
+        method = getattr(self._innova, command)
+        return lambda: method(*args, **kwargs)
+
+    def update(self, force_refresh: bool = False, timeout: float = None) -> bool:
+        self.loop_thread.check_thread()
+        update = self._innova.async_update(force_refresh)
+        return self.loop_thread.run(update, timeout)
+
+    def snapshot(self) -> StatusSnapshot:
+        return self._innova.snapshot()
+
+    def polled_snapshot(self) -> StatusSnapshot:
+        return self._innova.polled_snapshot()
+
+    def __repr__(self) -> str:
+        return f"SyncInnova(Name: {self.name}, Model: {self.model})"
+
+
+def _mirror_property(name: str) -> property:
+    return property(
+        lambda self: getattr(self._innova, name), doc=getattr(Innova, name).__doc__
+    )
+
+
+def _mirror_command(name: str) -> Callable:
+    def command(self, *args, timeout: float = None, **kwargs):
+        self.loop_thread.check_thread()
+        result = getattr(self._innova, name)(*args, **kwargs)
+        return self.loop_thread.run(result, timeout)
+
+    command.__name__ = name
+    command.__doc__ = getattr(Innova, name).__doc__
+    return command
+
+
+for _name, _member in inspect.getmembers(Innova):
+    if _name.startswith("_") or hasattr(SyncInnova, _name):
+        continue
+    if isinstance(_member, property):
+        setattr(SyncInnova, _name, _mirror_property(_name))
+    elif inspect.iscoroutinefunction(_member) and _name != "async_update":
+        setattr(SyncInnova, _name, _mirror_command(_name))
@@ -0,0 +1,206 @@
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from types import SimpleNamespace
+
+from aiohttp import TraceConfig
+
+from innova_controls.constants import TRACE_EVENTS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Phases of a request, in the order they happen
+PHASES = ("queue_wait", "dns", "connect", "request_sent", "first_byte")
+
+
+class RequestTrace:
+    """Timings of one http request, in seconds
+
+    Attributes:
+        queue_wait: time waiting for a free connection of the pool
+        dns: time resolving the host name (cloud mode only)
+        connect: time opening the TCP connection, without dns
+        request_sent: time from getting a connection to the request being sent
+        first_byte: time from the request being sent to the response headers
+        total: time from the start of the request to the response headers
+    Phases that didn't happen (reused connection, no dns...) are 0.
+    """
+
+    __slots__ = (
+        ("unit", "path", "method", "started_at", "reused_connection", "error")
+        + PHASES
+        + ("total",)
+    )
+
+    def __init__(self, unit: str, path: str, method: str) -> None:
+        self.unit = unit
+        self.path = path
+        self.method = method
+        self.started_at = time.time()
+        self.reused_connection = False
+        self.error: str = None
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+        self.total = 0.0
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self) -> str:
+        phases = ", ".join(f"{phase}={getattr(self, phase):.4f}" for phase in PHASES)
+        return (
+            f"RequestTrace({self.method} {self.unit} {self.path}: {phases}, "
+            f"total={self.total:.4f}, reused={self.reused_connection}, "
+            f"error={self.error})"
+        )
+
+
+class UnitTraceStats:
+    """Phase timings of the requests of one unit, summed"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.totals = dict.fromkeys(PHASES + ("total",), 0.0)
+
+    def add(self, trace: RequestTrace) -> None:
+        self.requests += 1
+        if trace.error is not None:
+            self.errors += 1
+        for phase in self.totals:
+            self.totals[phase] += getattr(trace, phase)
+
+    def mean(self, phase: str) -> float:
+        return self.totals[phase] / self.requests if self.requests else 0
+
+    def __repr__(self) -> str:
+        means = ", ".join(
+            f"{phase}={self.mean(phase):.4f}" for phase in PHASES + ("total",)
+        )
+        return (
+            f"UnitTraceStats(Requests: {self.requests}, Errors: {self.errors}, "
+            f"{means})"
+        )
+
+
+class RequestTracer:
+    """Records where the time of each request goes, per unit
+
+    Builds an aiohttp TraceConfig to add to the http session, see
+    InnovaSessionFactory(tracer=...) or
+    ClientSession(trace_configs=[tracer.trace_config()]).
+    NetWorkFunctions tags its requests with the unit and command path.
+
+    Attributes:
+        max_events: int
+            Number of most recent RequestTrace kept in events.
+        on_event: Callable[[RequestTrace], None]
+            Called with each completed RequestTrace.
+    """
+
+    def __init__(
+        self,
+        max_events: int = TRACE_EVENTS,
+        on_event: Callable[[RequestTrace], None] = None,
+    ) -> None:
+        self.events: deque[RequestTrace] = deque(maxlen=max_events)
+        self.units: dict[str, UnitTraceStats] = {}
+        self._on_event = on_event
+
+    def slowest_units(self, phase: str = "total", count: int = 10) -> list:
+        """Units with the highest mean time spent in a phase, slowest first"""
+        return sorted(
+            self.units.items(), key=lambda item: item[1].mean(phase), reverse=True
+        )[:count]
+
+    def trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_start.append(self._on_create_start)
+        trace_config.on_connection_create_end.append(self._on_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_reuseconn)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace_config.on_request_headers_sent.append(self._on_headers_sent)
+        trace_config.on_request_chunk_sent.append(self._on_chunk_sent)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        return trace_config
+
+    @staticmethod
+    def _elapsed(context: SimpleNamespace) -> float:
+        return time.perf_counter() - context.mark
+
+    @staticmethod
+    def _mark(context: SimpleNamespace) -> None:
+        context.mark = time.perf_counter()
+
+    async def _on_request_start(self, session, context: SimpleNamespace, params):
+        request_context = context.trace_request_ctx or {}
+        unit = request_context.get("unit", params.url.host)
+        path = request_context.get("path", params.url.path)
+        context.trace = RequestTrace(unit, path, params.method)
+        context.start = time.perf_counter()
+        # Time up to getting a connection is not part of sending the request
+        context.connected = context.start
+        self._mark(context)
+
+    async def _on_queued_start(self, session, context, params) -> None:
+        self._mark(context)
+
+    async def _on_queued_end(self, session, context, params) -> None:
+        context.trace.queue_wait += self._elapsed(context)
+
+    async def _on_create_start(self, session, context, params) -> None:
+        self._mark(context)
+
+    async def _on_create_end(self, session, context, params) -> None:
+        # DNS resolution happens while the connection is created
+        context.trace.connect += self._elapsed(context) - context.trace.dns
+        context.connected = time.perf_counter()
+
+    async def _on_reuseconn(self, session, context, params) -> None:
+        context.trace.reused_connection = True
+        context.connected = time.perf_counter()
+
+    async def _on_dns_start(self, session, context, params) -> None:
+        context.dns_start = time.perf_counter()
+
+    async def _on_dns_end(self, session, context, params) -> None:
+        context.trace.dns += time.perf_counter() - context.dns_start
+
+    async def _on_headers_sent(self, session, context, params) -> None:
+        context.sent = time.perf_counter()
+
+    async def _on_chunk_sent(self, session, context, params) -> None:
+        context.sent = time.perf_counter()
+
+    async def _on_request_end(self, session, context, params) -> None:
+        self._complete(context)
+
+    async def _on_request_exception(self, session, context, params) -> None:
+        context.trace.error = repr(params.exception)
+        self._complete(context)
+
+    def _complete(self, context: SimpleNamespace) -> None:
+        now = time.perf_counter()
+        trace: RequestTrace = context.trace
+        sent = getattr(context, "sent", None)
+        if sent is not None:
+            trace.request_sent = sent - context.connected
+            trace.first_byte = now - sent
+        trace.total = now - context.start
+
+        self.events.append(trace)
+        stats = self.units.get(trace.unit)
+        if stats is None:
+            stats = self.units[trace.unit] = UnitTraceStats()
+        stats.add(trace)
+        if self._on_event is not None:
+            try:
+                self._on_event(trace)
+            except Exception as e:
+                _LOGGER.error(f"Error in request trace callback: {e}")
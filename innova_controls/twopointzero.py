@@ -1,4 +1,5 @@
 from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
 from innova_controls.constants import (CMD_FAN_SPEED, CMD_NIGHT_MODE,
                                        CMD_ROTATION, CMD_SET_TEMP,
@@ -7,7 +8,9 @@ from innova_controls.constants import (CMD_FAN_SPEED, CMD_NIGHT_MODE,
 from innova_controls.fan_speed import FanSpeed
 from innova_controls.innova_device import InnovaDevice
 from innova_controls.mode import Mode
-from innova_controls.network_functions import NetWorkFunctions
+
+if TYPE_CHECKING:
+    from innova_controls.network_functions import NetWorkFunctions
 
 
 class TwoPointZero(InnovaDevice):
@@ -40,7 +43,9 @@ class TwoPointZero(InnovaDevice):
     # Ignore speed 4 for reasons explained above
     fan_speeds_reverse = {v: k for k, v in fan_speeds.items() if k != 4}
 
-    def __init__(self, network_facade: NetWorkFunctions) -> None:
+    STATUS_FIELDS = InnovaDevice.STATUS_FIELDS + ("t", "sp", "fs", "fr", "nm")
+
+    def __init__(self, network_facade: "NetWorkFunctions") -> None:
         super().__init__(network_facade)
 
     @property
@@ -51,19 +56,23 @@ class TwoPointZero(InnovaDevice):
     def temperature_step(self) -> float:
         return 1.0
 
+    @classmethod
+    def _decode_result(cls, result: dict) -> dict:
+        return {
+            "ambient_temp": result.get("t", 0),
+            "target_temperature": result.get("sp", 0),
+            "fan_code": result.get("fs"),
+            "rotation": result.get("fr") == ROTATION_ON,
+            "night_mode": result.get("nm") == NIGHT_MODE_ON,
+        }
+
     @property
     def ambient_temp(self) -> float:
-        if "t" in self._status:
-            return self._status["t"]
-        else:
-            return 0
+        return self._snapshot.ambient_temp
 
     @property
     def target_temperature(self) -> float:
-        if "sp" in self._status:
-            return self._status["sp"]
-        else:
-            return 0
+        return self._snapshot.target_temperature
 
     @property
     def water_temperature(self) -> float:
@@ -71,8 +80,8 @@ class TwoPointZero(InnovaDevice):
 
     @property
     def fan_speed(self) -> FanSpeed:
-        if "fs" in self._status:
-            return self.fan_speeds[self._status["fs"]]
+        if self._snapshot.fan_code is not None:
+            return self.fan_speeds[self._snapshot.fan_code]
         return FanSpeed.AUTO
 
     @property
@@ -82,22 +91,16 @@ class TwoPointZero(InnovaDevice):
 
     @property
     def rotation(self) -> bool:
-        if "fr" in self._status:
-            if self._status["fr"] == ROTATION_ON:
-                return True
-        return False
+        return self._snapshot.rotation
 
     @property
     def night_mode(self) -> bool:
-        if "nm" in self._status:
-            if self._status["nm"] == NIGHT_MODE_ON:
-                return True
-        return False
+        return self._snapshot.night_mode
 
     async def set_temperature(self, temperature: float) -> bool:
         data = {"p_temp": temperature}
         if await self._network_facade.send_command(CMD_SET_TEMP, data=data):
-            self._status["sp"] = temperature
+            self._update(target_temperature=temperature)
             return True
         return False
 
@@ -105,7 +108,7 @@ class TwoPointZero(InnovaDevice):
         speed_code = self.fan_speeds_reverse[speed]
         data = {"value": speed_code}
         if await self._network_facade.send_command(CMD_FAN_SPEED, data=data):
-            self._status["fs"] = speed_code
+            self._update(fan_code=speed_code)
             return True
         return False
 
@@ -116,14 +119,14 @@ class TwoPointZero(InnovaDevice):
     async def rotation_on(self) -> bool:
         data = {"value": ROTATION_ON}
         if await self._network_facade.send_command(CMD_ROTATION, data=data):
-            self._status["fr"] = ROTATION_ON
+            self._update(rotation=True)
             return True
         return False
 
     async def rotation_off(self) -> bool:
         data = {"value": ROTATION_OFF}
         if await self._network_facade.send_command(CMD_ROTATION, data=data):
-            self._status["fr"] = ROTATION_OFF
+            self._update(rotation=False)
             return True
         return False
 
@@ -131,14 +134,14 @@ class TwoPointZero(InnovaDevice):
         data = {"value": NIGHT_MODE_ON}
         if await self._network_facade.send_command(CMD_NIGHT_MODE, data=data):
             await self.set_fan_speed(FanSpeed.LOW)
-            self._status["nm"] = NIGHT_MODE_ON
+            self._update(night_mode=True)
             return True
         return False
 
     async def night_mode_off(self) -> bool:
         data = {"value": NIGHT_MODE_OFF}
         if await self._network_facade.send_command(CMD_NIGHT_MODE, data=data):
-            self._status["nm"] = NIGHT_MODE_OFF
+            self._update(night_mode=False)
             return True
         return False
 
@@ -27,7 +27,15 @@ setup(
     packages=["innova_controls"],
     # https://packaging.python.org/guides/distributing-packages-using-setuptools/#python-requires
     python_requires=">=3.9, <4",
-    install_requires=["aiohttp >= 3.0.0, < 4.0.0", "retry2>=0.9.5"],
+    install_requires=["aiohttp >= 3.0.0, < 4.0.0"],
+    extras_require={
+        "fast": ["orjson"],
+        "numpy": ["numpy"],
+        "arrow": ["pyarrow"],
+    },
+    entry_points={
+        "console_scripts": ["innova-discover=innova_controls.discovery:main"],
+    },
     project_urls={
         "Bug Reports": "https://github.com/danielrivard/innova-controls/issues",
         "Source": "https://github.com/danielrivard/innova-controls/",
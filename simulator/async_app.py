@@ -0,0 +1,325 @@
+"""Asyncio simulator hosting many virtual Innova units.
+
+Each virtual unit has its own state and fault injection settings. Units are
+reached either:
+  * by path prefix on a single port: http://127.0.0.1:8080/u42/api/v/1/status
+    (use host="127.0.0.1:8080/u42" with Innova)
+  * by Host header: http://u42.sim:8080/api/v/1/status
+  * or with --one-port-per-unit, on ports 8080, 8081...
+
+Faults (latency, timeouts, dropped connections, HTTP 5xx, success false) are
+set for all units from the command line, per unit from a json file
+({"u42": {"latency": 2, "error_rate": 0.5}}), or at runtime:
+    curl -X POST http://127.0.0.1:8080/_sim/units/u42/faults \\
+         -d '{"timeout_rate": 1}'
+
+Run with: python simulator/async_app.py --units 1000 --airleaf-units 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+from aiohttp import web
+
+TWOPOINTZERO = "001"
+AIRLEAF = "002"
+
+# Working mode codes and commands, by device type
+MODES = {
+    TWOPOINTZERO: {
+        "heating": 0,
+        "cooling": 1,
+        "dehumidification": 3,
+        "fanonly": 4,
+        "auto": 5,
+    },
+    AIRLEAF: {"heating": 3, "cooling": 5},
+}
+FUNCTIONS = {"auto": 1, "night": 2, "min": 3, "max": 4}
+
+
+class Faults:
+    """Fault injection settings of a virtual unit. Rates are probabilities
+    between 0 and 1, applied to every request."""
+
+    FIELDS = (
+        "latency",
+        "jitter",
+        "timeout_rate",
+        "drop_rate",
+        "error_rate",
+        "failure_rate",
+    )
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        timeout_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        error_rate: float = 0.0,
+        failure_rate: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.timeout_rate = timeout_rate
+        self.drop_rate = drop_rate
+        self.error_rate = error_rate
+        self.failure_rate = failure_rate
+
+    def update(self, settings: dict) -> None:
+        for field, value in settings.items():
+            if field not in self.FIELDS:
+                raise ValueError(f"Unknown fault setting {field}")
+            setattr(self, field, float(value))
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class VirtualUnit:
+    def __init__(self, unit_id: str, index: int, device_type: str, faults: Faults):
+        self.unit_id = unit_id
+        self.device_type = device_type
+        self.faults = faults
+        self.mac_address = "06:1A:{:02X}:{:02X}:{:02X}:{:02X}".format(
+            *index.to_bytes(4, "big")
+        )
+        self.serial = f"IN{index:07d}"
+        self.ip = f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+        # Temperatures are multiplied by 10 on AirLeaf
+        self.scale = 10 if device_type == AIRLEAF else 1
+        self.power = 1
+        self.mode = MODES[device_type]["cooling"]
+        self.setpoint = 22 * self.scale
+        self.ambient = random.randint(18, 28) * self.scale
+        self.water = 215
+        self.fan_speed = 0
+        self.function = FUNCTIONS["auto"]
+        self.rotation = 7
+        self.night_mode = 0
+        self.scheduling = 0
+        self.keyboard_locked = 0
+        self.requests = 0
+
+    def status(self) -> dict:
+        # Ambient temperature slowly drifts towards the set point
+        if self.power and random.random() < 0.1:
+            step = self.scale if self.device_type == TWOPOINTZERO else 1
+            if self.ambient < self.setpoint:
+                self.ambient += step
+            elif self.ambient > self.setpoint:
+                self.ambient -= step
+
+        result = {
+            "a": [],
+            "cloudConfig": 1,
+            "cloudStatus": 4,
+            "cm": self.scheduling,
+            "connectionStatus": 2,
+            "heap": random.randint(11000, 12000),
+            "kl": self.keyboard_locked,
+            "lastRefresh": 2,
+            "ps": self.power,
+            "pwd": "",
+            "sp": self.setpoint,
+            "uptime": self.requests,
+            "wm": self.mode,
+        }
+        if self.device_type == AIRLEAF:
+            result.update(fn=self.function, ta=self.ambient, tw=self.water)
+        else:
+            result.update(fs=self.fan_speed, fr=self.rotation, nm=self.night_mode)
+            result["t"] = self.ambient
+        return {
+            "RESULT": result,
+            "UID": self.mac_address,
+            "deviceType": self.device_type,
+            "net": {
+                "dhcp": "1",
+                "gw": "10.0.0.1",
+                "ip": self.ip,
+                "sub": "255.0.0.0",
+            },
+            "setup": {"name": f"Sim {self.unit_id}", "serial": self.serial},
+            "success": True,
+            "sw": {"V": "1.0.42" if self.device_type == TWOPOINTZERO else "1.0.3"},
+            "time": {"d": 1, "h": 18, "i": 45, "m": 2, "y": 2023},
+        }
+
+    def apply(self, command: str, params: dict) -> bool:
+        if command == "power/on":
+            self.power = 1
+        elif command == "power/off":
+            self.power = 0
+        elif command == "set/calendar/on":
+            self.scheduling = 1
+        elif command == "set/calendar/off":
+            self.scheduling = 0
+        elif command == "set/lock/on":
+            self.keyboard_locked = 1
+        elif command == "set/lock/off":
+            self.keyboard_locked = 0
+        elif command == "set/setpoint":
+            value = params.get("temp", params.get("p_temp"))
+            if value is None:
+                return False
+            self.setpoint = int(float(value))
+        elif command == "set/fan":
+            self.fan_speed = int(params.get("value", 0))
+        elif command == "set/feature/rotation":
+            self.rotation = int(params.get("value", 7))
+        elif command == "set/feature/night":
+            self.night_mode = int(params.get("value", 0))
+        elif command.startswith("set/mode/"):
+            mode = MODES[self.device_type].get(command[len("set/mode/"):])
+            if mode is None:
+                return False
+            self.mode = mode
+            self.power = 1
+        elif command.startswith("set/function/"):
+            function = FUNCTIONS.get(command[len("set/function/"):])
+            if function is None:
+                return False
+            self.function = function
+        else:
+            return False
+        return True
+
+
+class Simulator:
+    def __init__(self) -> None:
+        self.units: dict[str, VirtualUnit] = {}
+        self.units_by_port: dict[int, VirtualUnit] = {}
+
+    def add_units(self, count: int, device_type: str, faults: dict) -> None:
+        for _ in range(count):
+            index = len(self.units)
+            unit_id = f"u{index}"
+            self.units[unit_id] = VirtualUnit(
+                unit_id, index, device_type, Faults(**faults)
+            )
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/_sim/units", self._list_units)
+        app.router.add_post("/_sim/units/{unit}/faults", self._set_faults)
+        app.router.add_route("*", "/api/v/1/{command:.*}", self._handle)
+        app.router.add_route("*", "/{unit}/api/v/1/{command:.*}", self._handle)
+        return app
+
+    def _find_unit(self, request: web.Request) -> VirtualUnit:
+        if "unit" in request.match_info:
+            return self.units.get(request.match_info["unit"])
+        port = request.transport.get_extra_info("sockname")[1]
+        if port in self.units_by_port:
+            return self.units_by_port[port]
+        # Host header routing: u42.sim:8080
+        return self.units.get(request.host.split(".")[0].split(":")[0])
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        unit = self._find_unit(request)
+        if unit is None:
+            raise web.HTTPNotFound(text="Unknown unit")
+        unit.requests += 1
+        faults = unit.faults
+
+        delay = faults.latency + random.uniform(0, faults.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if random.random() < faults.timeout_rate:
+            # Never answer, the client times out
+            await asyncio.sleep(3600)
+        if random.random() < faults.drop_rate:
+            request.transport.close()
+            return web.Response()
+        if random.random() < faults.error_rate:
+            return web.Response(status=503, text="Simulated server error")
+        if random.random() < faults.failure_rate:
+            return web.json_response({"success": False})
+
+        command = request.match_info["command"]
+        if command == "status" and request.method == "GET":
+            return web.json_response(unit.status())
+        if request.method != "POST":
+            raise web.HTTPMethodNotAllowed(request.method, ["POST"])
+
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        return web.json_response({"success": unit.apply(command, params)})
+
+    async def _list_units(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                unit_id: {
+                    "deviceType": unit.device_type,
+                    "requests": unit.requests,
+                    "faults": unit.faults.as_dict(),
+                }
+                for unit_id, unit in self.units.items()
+            }
+        )
+
+    async def _set_faults(self, request: web.Request) -> web.Response:
+        unit = self.units.get(request.match_info["unit"])
+        if unit is None:
+            raise web.HTTPNotFound(text="Unknown unit")
+        try:
+            unit.faults.update(await request.json())
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+        return web.json_response(unit.faults.as_dict())
+
+
+async def serve(simulator: Simulator, host: str, port: int, per_unit: bool) -> None:
+    runner = web.AppRunner(simulator.create_app(), access_log=None)
+    await runner.setup()
+    if per_unit:
+        for offset, unit in enumerate(simulator.units.values()):
+            await web.TCPSite(runner, host, port + offset).start()
+            simulator.units_by_port[port + offset] = unit
+        print(f"Serving {len(simulator.units)} units on ports {port}-{port + offset}")
+    else:
+        await web.TCPSite(runner, host, port).start()
+        print(f"Serving {len(simulator.units)} units on port {port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Innova multi-unit simulator")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--units", type=int, default=100, help="2.0 units")
+    parser.add_argument("--airleaf-units", type=int, default=0)
+    parser.add_argument("--one-port-per-unit", action="store_true")
+    parser.add_argument("--faults", help="json file of per unit fault settings")
+    for field in Faults.FIELDS:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=float, default=0.0)
+    args = parser.parse_args()
+
+    defaults = {field: getattr(args, field) for field in Faults.FIELDS}
+    simulator = Simulator()
+    simulator.add_units(args.units, TWOPOINTZERO, defaults)
+    simulator.add_units(args.airleaf_units, AIRLEAF, defaults)
+    if args.faults:
+        with open(args.faults) as faults_file:
+            for unit_id, settings in json.load(faults_file).items():
+                simulator.units[unit_id].faults.update(settings)
+
+    try:
+        asyncio.run(
+            serve(simulator, args.host, args.port, args.one_port_per_unit)
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()